@@ -0,0 +1,121 @@
+from typing import Any
+import pygame
+import threading
+
+
+class AssetCache:
+    """
+    Process-wide cache of decoded and scaled image surfaces.
+    Surfaces are keyed by (path, size, alpha) and shared between sprites,
+    so sprites must never draw onto the surface they were handed.
+    Safe to fill from a loader thread while the game reads from it.
+    Collision masks are cached the same way, keyed by (path, size).
+    """
+
+    def __init__(self):
+        self._surfaces = {}
+        self._masks = {}
+        self._lock = threading.RLock()   # Re-entrant: scaling looks up the original.
+        self.hits = 0
+        self.misses = 0
+
+    def image(self, path: str, size: tuple = None, alpha: bool = True) -> Any:
+        """
+        Return the surface for path, scaled to size (or unscaled when size is None).
+        Alpha selects convert_alpha() over convert(). Decoding only happens on a miss.
+        """
+        key = (path, size, alpha)
+        surface = self._surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        with self._lock:
+            # Another thread may have decoded it while this one waited.
+            surface = self._surfaces.get(key)
+            if surface is not None:
+                self.hits += 1
+                return surface
+
+            self.misses += 1
+            if size is None:
+                surface = self._decode(path, alpha)
+            else:
+                # Scale from the cached original so the PNG is only ever read once.
+                surface = pygame.transform.scale(self.image(path, None, alpha), size)
+
+            self._surfaces[key] = surface
+            return surface
+
+    def mask(self, path: str, size: tuple) -> Any:
+        """
+        Return the collision mask of path scaled to size: the pixels that are
+        at least half opaque. Built once per (path, size) from the cached image.
+        """
+        key = (path, size)
+        mask = self._masks.get(key)
+        if mask is not None:
+            return mask
+
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is None:
+                mask = pygame.mask.from_surface(self.image(path, size))
+                self._masks[key] = mask
+            return mask
+
+    def rescale(self, surface: Any, size: tuple) -> Any:
+        """
+        Return a smoothly scaled copy of any surface. It runs under the cache
+        lock, so it never overlaps a decode on the loader thread.
+        """
+        if 0 in surface.get_size():
+            return surface  # Nothing to scale (an empty line of text); smoothscale() would crash on it.
+
+        with self._lock:
+            # Smooth scaling needs 24 or 32 bits per pixel.
+            if surface.get_bitsize() >= 24:
+                return pygame.transform.smoothscale(surface, size)
+            return pygame.transform.scale(surface, size)
+
+    def invalidate(self, path: str = None) -> int:
+        """
+        Drop cached surfaces for path, or every surface when path is None.
+        Return the number of entries removed.
+        """
+        if path is None:
+            removed = len(self._surfaces)
+            self._surfaces.clear()
+            self._masks.clear()
+            return removed
+
+        stale = [key for key in self._surfaces if key[0] == path]
+        for key in stale:
+            del self._surfaces[key]
+        for key in [key for key in self._masks if key[0] == path]:
+            del self._masks[key]
+        return len(stale)
+
+    def stats(self) -> dict:
+        """
+        Return the hit/miss counters and the number of cached surfaces.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._surfaces), "masks": len(self._masks)}
+
+    @staticmethod
+    def _decode(path: str, alpha: bool) -> Any:
+        """
+        Read an image from disk. Pixel-format conversion needs a display,
+        so it is skipped when no window has been opened yet.
+        """
+        surface = pygame.image.load(path)
+
+        if pygame.display.get_surface() is None:
+            return surface
+
+        return surface.convert_alpha() if alpha else surface.convert()
+
+
+# Shared by every sprite in the process.
+asset_cache = AssetCache()
@@ -0,0 +1,135 @@
+from constants import Constants
+from time import perf_counter
+from typing import Any
+import pygame
+
+
+class SoundBank(Constants):
+    """
+    Sound effects decoded once at startup and played through a fixed pool
+    of reserved mixer channels. When every channel is busy, the voice that
+    started first is stolen. Without a working mixer every call is a no-op,
+    so game logic never has to check for audio.
+    """
+
+    def __init__(self):
+        self._sounds = {}
+        self._channels = []
+        self._started = []      # perf_counter() of the last play on each channel.
+        self._music_path = None
+        self.decode_time = 0.0  # Seconds spent decoding effects from disk.
+        self.plays = 0
+        self.steals = 0
+        self.play_latency = 0.0  # Seconds spent inside play(), summed over all plays.
+        self.max_play_latency = 0.0
+
+    def init(self) -> bool:
+        """
+        Initialize the mixer (once) and reserve the effect channels.
+        Return False when no audio device is available.
+        """
+        if self._channels:
+            return True
+
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error:
+            return False
+
+        count = self._sound_channels()
+        if pygame.mixer.get_num_channels() < count:
+            pygame.mixer.set_num_channels(count)
+
+        # Reserved channels are never handed out by Sound.play(), so music
+        # and stray effects cannot take over the pool.
+        pygame.mixer.set_reserved(count)
+        self._channels = [pygame.mixer.Channel(i) for i in range(count)]
+        self._started = [0.0] * count
+        return True
+
+    def load(self, name: str, path: str, volume: float = 1.0) -> None:
+        """
+        Decode path into the bank under name. Loading an existing name is skipped.
+        """
+        if name in self._sounds or not self._channels:
+            return
+
+        start = perf_counter()
+        sound = pygame.mixer.Sound(path)
+        self.decode_time += perf_counter() - start
+
+        sound.set_volume(volume)
+        self._sounds[name] = sound
+
+    def play(self, name: str) -> Any:
+        """
+        Play a preloaded effect and return the channel used, or None.
+        """
+        sound = self._sounds.get(name)
+        if sound is None:
+            return None
+
+        start = perf_counter()
+        index = self._free_channel()
+        channel = self._channels[index]
+        channel.play(sound)
+        self._started[index] = start
+
+        latency = perf_counter() - start
+        self.plays += 1
+        self.play_latency += latency
+        self.max_play_latency = max(self.max_play_latency, latency)
+        return channel
+
+    def preload_music(self, path: str) -> None:
+        """
+        Load the music file ahead of play_music(), which then starts it without touching the disk.
+        """
+        if not self._channels or self._music_path == path:
+            return
+
+        pygame.mixer.music.load(path)
+        self._music_path = path
+
+    def play_music(self, path: str, volume: float) -> None:
+        """
+        Loop background music from the start. The file is only loaded when it changes.
+        """
+        if not self._channels:
+            return
+
+        if self._music_path != path:
+            pygame.mixer.music.load(path)
+            self._music_path = path
+
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)
+
+    def stats(self) -> dict:
+        """
+        Return decode time and playback latency counters (in milliseconds).
+        """
+        return {
+            "sounds": len(self._sounds),
+            "decode_ms": self.decode_time * 1000,
+            "plays": self.plays,
+            "steals": self.steals,
+            "avg_play_ms": (self.play_latency / self.plays * 1000) if self.plays else 0.0,
+            "max_play_ms": self.max_play_latency * 1000,
+        }
+
+    def _free_channel(self) -> int:
+        """
+        Return the index of an idle channel, or steal the oldest voice.
+        """
+        for i, channel in enumerate(self._channels):
+            if not channel.get_busy():
+                return i
+
+        self.steals += 1
+        return self._started.index(min(self._started))
+
+
+# Shared by the whole game; loaded once in main.py.
+sound_bank = SoundBank()
@@ -0,0 +1,129 @@
+from constants import Constants
+from reachability import jump_drag, solve_jump
+from time import perf_counter
+from typing import Any
+import math
+import pygame
+import random
+
+# Built-in bot for load and soak testing. It is an input source, not a
+# second game loop: every frame it looks at the active state and returns the
+# mouse events a player would have made, and Game feeds them through the
+# same handle_event() calls as real input. In a game it picks the highest
+# platform it has not touched yet that it can land on, and solves for the
+# jump with reachability.solve_jump(). Buttons are clicked as soon as they
+# work, so it plays game after game until stopped.
+
+
+class AutoPlayer(Constants):
+    """
+    Produces one frame of input at a time and counts its throughput.
+    """
+
+    def __init__(self, rng: Any = None, seconds: float = None):
+        self.rng = rng if rng is not None else random.Random()
+        self.seconds = seconds  # Stop after this long; None plays until the window is closed.
+        self.frames = 0
+        self.jumps = 0
+        self.blind_jumps = 0    # Jumps made with no landing in sight.
+        self.games = 0
+        self._playing = None    # The game being played, to count new ones.
+        self.started = perf_counter()
+        self._last_report = (self.started, 0, 0)    # (time, frames, jumps) at the last report.
+
+    def events(self, state: Any) -> list:
+        """
+        Return the events to handle this frame for the active state.
+        """
+        self.frames += 1
+        button_rect = getattr(state, "button_rect", None)
+        if button_rect is not None:
+            # Start and Game Over screens.
+            return [self._click(pygame.MOUSEBUTTONDOWN, button_rect.center)]
+
+        player = getattr(state, "player", None)
+        if player is None or player.is_jumping or state.dragging:
+            return []  # In the air, or between screens.
+
+        if state is not self._playing:
+            self._playing = state
+            self.games += 1
+
+        vector = self._choose_jump(state)
+        press = player.rect.center
+        self.jumps += 1
+        return [self._click(pygame.MOUSEBUTTONDOWN, press), self._click(pygame.MOUSEBUTTONUP, jump_drag(vector, press))]
+
+    def _choose_jump(self, state: Any) -> tuple:
+        """
+        Return the jump to the highest untouched platform that can be landed on,
+        or to any other platform, or a blind jump when none can.
+        """
+        player = state.player.rect
+        floor = state.world.floor() if state.world else None
+        platforms = state.platforms.sprites()
+
+        # The platform under the player is never a target; the rest are tried from the top.
+        candidates = [
+            platform for platform in platforms
+            if not (platform.rect.top == player.bottom and platform.rect.left < player.right and player.left < platform.rect.right)
+        ]
+        candidates.sort(key=lambda platform: (platform in state.touched_platforms, platform.rect.top))
+
+        for platform in candidates:
+            vector = solve_jump(player, platform, platforms, floor)
+            if vector is not None:
+                return vector
+
+        self.blind_jumps += 1
+        strength = self._max_jump() * self.rng.uniform(0.25, 1.0)
+        angle = self.rng.uniform(0, math.pi)
+        return (strength * math.cos(angle), -strength * math.sin(angle))
+
+    def _click(self, kind: int, position: tuple) -> Any:
+        return pygame.event.Event(kind, pos=tuple(position), button=1)
+
+    def finished(self) -> bool:
+        return self.seconds is not None and perf_counter() - self.started >= self.seconds
+
+    def throughput(self) -> dict:
+        """
+        Return frames and jumps per second since the bot started.
+        """
+        elapsed = max(perf_counter() - self.started, 1e-9)
+        return {
+            "seconds": elapsed,
+            "frames": self.frames,
+            "jumps": self.jumps,
+            "games": self.games,
+            "blind_jumps": self.blind_jumps,
+            "frames_per_second": self.frames / elapsed,
+            "jumps_per_second": self.jumps / elapsed,
+        }
+
+    def report(self, interval: float = None) -> None:
+        """
+        Print the throughput since the last report, at most every interval
+        seconds; with no interval, print the totals.
+        """
+        now = perf_counter()
+        last_time, last_frames, last_jumps = self._last_report
+
+        if interval is None:
+            totals = self.throughput()
+            print(
+                f"Autoplay: {totals['frames']} frames, {totals['jumps']} jumps, {totals['games']} games "
+                f"in {totals['seconds']:.1f} s ({totals['frames_per_second']:.0f} frames/s, "
+                f"{totals['jumps_per_second']:.1f} jumps/s, {totals['blind_jumps']} blind jumps)"
+            )
+            return
+
+        if now - last_time < interval:
+            return
+
+        elapsed = now - last_time
+        print(
+            f"Autoplay: {(self.frames - last_frames) / elapsed:.0f} frames/s, "
+            f"{(self.jumps - last_jumps) / elapsed:.1f} jumps/s, {self.games} games"
+        )
+        self._last_report = (now, self.frames, self.jumps)
@@ -0,0 +1,145 @@
+from constants import Constants
+from config import settings
+from typing import Any
+import numpy as np
+
+# Vectorized version of simulation.update_body() and simulation.land_on_platforms()
+# for many players sharing one platform layout. Positions are kept as integers
+# and rounded the same way pygame.Rect rounds float assignments, so each player
+# follows exactly the same path as the scalar Player sprite.
+
+
+def _rect_round(values: Any) -> Any:
+    """
+    Round like pygame.Rect attribute assignment: halves go away from zero.
+    """
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+
+class BatchPhysics(Constants):
+    """
+    Hold N players' positions and velocities plus the platform rects in NumPy
+    arrays, and advance every player one tick at a time.
+    """
+
+    def __init__(self, num_players: int, platform_rects: Any):
+        self.num_players = num_players
+        self.x = np.zeros(num_players, dtype=np.int64)      # rect.x
+        self.y = np.zeros(num_players, dtype=np.int64)      # rect.y
+        self.velocity_x = np.zeros(num_players)
+        self.velocity_y = np.zeros(num_players)
+        self.is_jumping = np.zeros(num_players, dtype=bool)
+        self.alive = np.ones(num_players, dtype=bool)       # False once Game Over is reached.
+        self.score = np.zeros(num_players, dtype=np.int64)
+        self.set_platforms(platform_rects)
+
+    def set_platforms(self, platform_rects: Any) -> None:
+        """
+        Replace the shared layout. platform_rects is a sequence of (x, y, w, h);
+        platform order breaks ties when two crossed platforms share a top.
+        """
+        rects = np.asarray([tuple(rect) for rect in platform_rects], dtype=np.int64).reshape(-1, 4)
+        self.platform_left = rects[:, 0]
+        self.platform_top = rects[:, 1]
+        self.platform_right = rects[:, 0] + rects[:, 2]
+        self.platform_bottom = rects[:, 1] + rects[:, 3]
+        self.touched = np.zeros((self.num_players, len(rects)), dtype=bool)
+
+    def place_on(self, platform_index: int) -> None:
+        """
+        Stand every player on one platform, as PlayingState does with the lowest platform.
+        The platform is marked as touched so it does not score.
+        """
+        width = self._player_w()
+        height = self._player_h()
+        centerx = (self.platform_left[platform_index] + self.platform_right[platform_index]) // 2
+        centery = self.platform_top[platform_index] - height // 2
+
+        # Same arithmetic as assigning rect.center.
+        self.x[:] = centerx - width // 2
+        self.y[:] = centery - height // 2
+        self.velocity_x[:] = 0
+        self.velocity_y[:] = 0
+        self.is_jumping[:] = False
+        self.touched[:, platform_index] = True
+
+    def jump(self, vectors: Any, mask: Any = None) -> None:
+        """
+        Apply calculate_vector() results, shape (N, 2), to grounded players.
+        mask optionally limits which players jump.
+        """
+        vectors = np.asarray(vectors, dtype=np.float64)
+        ready = self.alive & ~self.is_jumping
+        if mask is not None:
+            ready &= mask
+
+        self.velocity_x[ready] = vectors[ready, 0]
+        self.velocity_y[ready] = vectors[ready, 1]
+        self.is_jumping |= ready
+
+    def step(self) -> Any:
+        """
+        Advance every live player by one tick. Return the mask of players
+        that reached Game Over during this tick.
+        """
+        width = settings.player_width
+        height = settings.player_height
+        alive = self.alive
+
+        # Gravity and the velocity clamp, only for airborne players.
+        moving = alive & self.is_jumping
+        previous_y = self.y
+        vy = np.where(moving, np.minimum(self.velocity_y + settings.gravity, settings.max_velocity), self.velocity_y)
+        self.velocity_y = vy
+        self.y = np.where(moving, _rect_round(self.y + vy), self.y)
+        self.x = np.where(moving, _rect_round(self.x + self.velocity_x), self.x)
+
+        game_over = moving & (self.y + height >= settings.screen_height)
+        alive &= ~game_over
+
+        # Wrap around the screen (never on the tick that ended the game).
+        wrap_right = alive & (self.x + width > settings.wrap_right)
+        wrap_left = alive & ~wrap_right & (self.x < settings.wrap_left)
+        self.x[wrap_right] = _rect_round(np.float64(settings.wrap_left))
+        self.x[wrap_left] = _rect_round(np.float64(settings.wrap_right)) - width
+
+        self._land(alive, previous_y, width, height)
+        return game_over
+
+    def _land(self, alive: Any, previous_y: Any, width: int, height: int) -> None:
+        """
+        Swept landing: a falling player lands on the highest platform whose top its
+        bottom edge crossed this tick, starting no lower than the collision buffer.
+        Each newly touched platform scores once.
+        """
+        falling = alive & (self.velocity_y > 0)
+        if not falling.any():
+            return
+
+        x = self.x[:, None]
+        bottom = self.y[:, None] + height
+        previous_bottom = previous_y[:, None] + height
+
+        landable = (
+            (x < self.platform_right) & (self.platform_left < x + width)
+            & (previous_bottom <= self.platform_top + settings.platform_collision_buffer)
+            & (bottom > self.platform_top)
+        )
+        landable &= falling[:, None]
+
+        landed = landable.any(axis=1)
+        if not landed.any():
+            return
+
+        # Highest crossed platform; ties go to the first platform, like the scalar loop.
+        tops = np.where(landable[landed], self.platform_top, np.iinfo(np.int64).max)
+        first = tops.argmin(axis=1)
+        players = np.nonzero(landed)[0]
+
+        self.y[players] = self.platform_top[first] - height
+        self.velocity_y[players] = 0
+        self.is_jumping[players] = False
+
+        new = ~self.touched[players, first]
+        self.touched[players[new], first[new]] = True
+        self.score[players[new]] += settings.platform_score
@@ -0,0 +1,634 @@
+import os
+
+# Benchmarks run without a window or sound card.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from constants import Constants
+from config import configure, settings, snapshot
+from sprites import Player, Platform, platform_pool, item_pool
+from spatial_index import SpatialGroup
+from scores import score_store
+from simulation import calculate_vector, generate_layout
+from reachability import predict_landing
+from random import Random
+from time import perf_counter
+from typing import Any
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import pygame
+import resource
+import sys
+import tempfile
+
+# Hot-path benchmarks. The suite times each piece of the game loop for every
+# combination of platform count and resolution and writes the results as JSON.
+# A later run can be checked against a saved baseline with --compare; any
+# benchmark slower than the baseline by more than --threshold fails the run.
+
+_FRAME_WARMUP = 60      # Frames run before the frame benchmark starts timing.
+_JUMP_SAMPLES = 16      # Drags tried by the scripted input per jump.
+_ROUNDS = 5             # Timing rounds per hot-path benchmark; the fastest is kept.
+_FRAME_ROUNDS = 3       # Rounds of each frame benchmark compared side by side.
+
+
+def _time_per_call(func: Any, calls: int, rounds: int = 1) -> float:
+    """
+    Return the mean wall time of func() in microseconds. With several rounds,
+    the calls are split between them and the fastest round is kept, which
+    filters out noise from the rest of the machine.
+    """
+    per_round = max(1, calls // rounds)
+    best = None
+    for _ in range(rounds):
+        start = perf_counter()
+        for _ in range(per_round):
+            func()
+        elapsed = (perf_counter() - start) / per_round * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def _tower(count: int, rng: Any) -> list:
+    """
+    Build a tower of count platforms, about one screen-height per eight platforms.
+    """
+    height = max(Constants._screen_h(), count * Constants._screen_h() // Constants._num_platforms())
+    return [
+        Platform(
+            rng.randint(0, Constants._screen_w() - Constants._platform_w()),
+            Constants._screen_h() - rng.randint(Constants._platform_h(), height)
+        )
+        for _ in range(count)
+    ]
+
+
+def bench_collision(counts: tuple = (10, 100, 1000, 10000), calls: int = 2000, seed: int = 0) -> list[dict]:
+    """
+    Time Player.check_collision against towers of increasing size, with a plain
+    sprite group (linear scan) and with the spatial index.
+    """
+    results = []
+    for count in counts:
+        rng = Random(seed)
+        platforms = _tower(count, rng)
+        player = Player()
+
+        # Falling onto a random platform of the tower, so every call resolves a landing.
+        target = platforms[rng.randrange(count)].rect
+        start = player.rect.copy()
+        start.midbottom = (target.centerx, target.top + 1)
+        previous = start.move(0, -Constants._max_velocity())
+
+        row = {"platforms": count}
+        for name, group in (("linear_us", pygame.sprite.Group(platforms)), ("indexed_us", SpatialGroup(platforms))):
+            items = pygame.sprite.Group()
+
+            def check() -> None:
+                player.rect.update(start)
+                player.previous_rect.update(previous)
+                player.velocity_y = Constants._max_velocity()
+                player.check_collision(group, items, set(), 0)
+
+            row[name] = _time_per_call(check, calls)
+
+        results.append(row)
+
+    return results
+
+
+def bench_layout(counts: tuple = (8, 100, 1000, 10000), calls: int = 2000, seed: int = 0) -> list[dict]:
+    """
+    Time generate_layout() for towers of each size, keeping the game's platform
+    density (the tower gets one screen of height per NUM_PLATFORMS platforms).
+    Return microseconds per layout and per platform; the second should stay flat.
+    """
+    rng = Random(seed)
+    results = []
+    for count in counts:
+        height = count * Constants._screen_h() // Constants._num_platforms()
+        per_call = _time_per_call(lambda: generate_layout(count, rng, height=height), max(1, calls * 8 // count), _ROUNDS)
+        results.append({"platforms": count, "layout_us": per_call, "per_platform_us": per_call / count})
+
+    return results
+
+
+def _configure(num_platforms: int, resolution: tuple) -> None:
+    """
+    Apply a benchmark case to Constants and open a window of that size.
+    """
+    import screens
+
+    width, height = resolution
+    configure({"NUM_PLATFORMS": num_platforms, "SCREEN_WIDTH": width, "SCREEN_HEIGHT": height})
+    screens.init_display()
+
+
+def _landed_body(platforms: Any) -> Any:
+    """
+    Return (rect, previous_rect) of a player falling onto the first platform.
+    """
+    target = platforms.sprites()[0].rect
+    rect = pygame.Rect(0, 0, Constants._player_w(), Constants._player_h())
+    rect.midbottom = (target.centerx, target.top + 1)
+    return rect, rect.move(0, -Constants._max_velocity())
+
+
+def _scripted_drag(state: Any, rng: Any) -> tuple[int, int]:
+    """
+    Scripted input for the frame benchmark: the drag whose jump lands highest,
+    preferring new platforms, as predicted by reachability.predict_landing().
+    Falls back to a short hop straight up, which always lands back on the
+    same platform, so the game is never lost.
+    """
+    from level_evaluator import sample_drag
+
+    best_drag = (0, Constants._jump_factor())
+    best_key = None
+    for _ in range(_JUMP_SAMPLES):
+        drag = sample_drag(rng)
+        landing, _ = predict_landing(state.player.rect, calculate_vector((0, 0), drag), state.platforms)
+        if landing is None:
+            continue
+
+        key = (landing not in state.touched_platforms, -landing.rect.top)
+        if best_key is None or key > best_key:
+            best_key = key
+            best_drag = drag
+
+    return best_drag
+
+
+@contextlib.contextmanager
+def _scratch_files() -> Any:
+    """
+    Point the leaderboard and the jump recording at a temporary directory, so
+    games played by a benchmark never reach the player's highScore.csv or
+    lastGame.rec. Both are restored, with pending writes finished, on exit.
+    """
+    import replay
+
+    score_store.flush()
+    saved_store = (score_store.path, score_store.entries, score_store.loaded)
+    saved_recording = Constants._recording_file()
+
+    with tempfile.TemporaryDirectory() as directory:
+        score_store.path = os.path.join(directory, Constants._score_file())
+        score_store.entries = []
+        score_store.loaded = False
+        configure({"RECORDING_FILE": os.path.join(directory, saved_recording)})
+        try:
+            yield
+        finally:
+            score_store.flush()
+            replay.flush()
+            score_store.path, score_store.entries, score_store.loaded = saved_store
+            configure({"RECORDING_FILE": saved_recording})
+
+
+def bench_frames(frames: int, seed: int = 0) -> float:
+    """
+    Run frames of PlayingState through Game.run_frame() at the physics rate, with
+    scripted jumps, and return the mean frame time in microseconds.
+    """
+    with _scratch_files():
+        return _run_frames(frames, seed)
+
+
+def _run_frames(frames: int, seed: int) -> float:
+    import main
+
+    game = main.Game()
+    game.state = main.PlayingState(game)
+    game.state.enter()
+    rng = Random(seed)
+    step_time = settings.step_time
+    centre = (Constants._screen_w() // 2, Constants._screen_h() // 2)
+
+    elapsed = 0.0
+    timed = 0
+    for frame in range(frames + _FRAME_WARMUP):
+        events = []
+        state = game.state
+        if isinstance(state, main.PlayingState) and not state.player.is_jumping:
+            dx, dy = _scripted_drag(state, rng)
+            events = [
+                pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=centre, button=1),
+                pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(centre[0] + dx, centre[1] + dy), button=1),
+            ]
+
+        start = perf_counter()
+        game.run_frame(step_time, events)
+        if frame >= _FRAME_WARMUP:
+            elapsed += perf_counter() - start
+            timed += 1
+
+    game.state.dispose()
+    return elapsed / timed * 1e6
+
+
+def bench_hot_paths(num_platforms: int, resolution: tuple, calls: int, frames: int, seed: int = 0) -> dict:
+    """
+    Time each hot path of the game loop with num_platforms platforms per screen
+    on a window of the given resolution. Return microseconds per call.
+    """
+    from helper_functions import generate_platforms, refresh_screen
+    import screens
+
+    saved = snapshot()
+    _configure(num_platforms, resolution)
+    configure({"SEED": seed})
+    rng = Random(seed)
+
+    try:
+        platforms, items, lowest, highest = generate_platforms(num_platforms, rng)
+        player = Player()
+        all_sprites = pygame.sprite.Group(player, platforms, items)
+        results = {}
+
+        # A player in mid-air, reset before every call so each update does the same work.
+        flying = player.rect.copy()
+        flying.center = (Constants._screen_w() // 2, Constants._screen_h() // 2)
+
+        def update() -> None:
+            player.rect.update(flying)
+            player.velocity_x, player.velocity_y = 3, -5
+            player.is_jumping = True
+            player.update()
+
+        results["player_update"] = _time_per_call(update, calls, _ROUNDS)
+
+        # Landing on a platform: the most expensive collision outcome.
+        landed, previous = _landed_body(platforms)
+        no_items = pygame.sprite.Group()
+
+        def check_collision() -> None:
+            player.rect.update(landed)
+            player.previous_rect.update(previous)
+            player.velocity_y = Constants._max_velocity()
+            player.check_collision(platforms, no_items, set(), 0)
+
+        results["check_collision"] = _time_per_call(check_collision, calls, _ROUNDS)
+
+        # Sprites go back to their pools after each call, as they do between screens.
+        def generate() -> None:
+            new_platforms, new_items, _, _ = generate_platforms(num_platforms, rng)
+            for sprite in new_platforms.sprites():
+                platform_pool.release(sprite)
+            for sprite in new_items.sprites():
+                item_pool.release(sprite)
+
+        results["generate_platforms"] = _time_per_call(generate, calls, _ROUNDS)
+
+        state = {"all_sprites": all_sprites, "highest": highest}
+
+        def refresh() -> None:
+            state["all_sprites"], _, state["highest"] = refresh_screen(
+                state["all_sprites"], player, platforms, items, set(), state["highest"], rng
+            )
+
+        results["refresh_screen"] = _time_per_call(refresh, calls, _ROUNDS)
+        results["calculate_vector"] = _time_per_call(lambda: calculate_vector((400, 300), (350, 420)), calls, _ROUNDS)
+
+        all_sprites = state["all_sprites"]
+        results["all_sprites_draw"] = _time_per_call(lambda: all_sprites.draw(screens.screen), calls, _ROUNDS)
+
+        for sprite in platforms.sprites():
+            platform_pool.release(sprite)
+        for sprite in items.sprites():
+            item_pool.release(sprite)
+        player.kill()
+
+        results["frame"] = bench_frames(frames, seed)
+        return results
+
+    finally:
+        configure(saved)
+
+
+def bench_window_scaling(windows: tuple = ((800, 600), (1920, 1080), (3840, 2160)), frames: int = 600, seed: int = 0) -> list[dict]:
+    """
+    Run the frame benchmark in windows of each size, with the 800x600 game
+    scaled to fit. Report the frame time, the surfaces scaled during the run
+    (the first frame and new score text only) and, for comparison, what
+    scaling one whole frame to the window would cost every frame.
+    """
+    import screens
+    from viewport import viewport
+
+    saved = snapshot()
+    rows = []
+    try:
+        for width, height in windows:
+            configure({"WINDOW_WIDTH": width, "WINDOW_HEIGHT": height, "SEED": seed})
+            screens.init_display()
+
+            frame = pygame.Surface((Constants._screen_w(), Constants._screen_h())).convert()
+            whole_frame = _time_per_call(lambda: pygame.transform.scale(frame, viewport.area.size), 50, _ROUNDS)
+
+            rescales = viewport.rescales
+            rows.append({
+                "window": f"{width}x{height}",
+                "scale": viewport.scale,
+                "frame_us": bench_frames(frames, seed),
+                "rescales": viewport.rescales - rescales,
+                "whole_frame_scale_us": whole_frame,
+            })
+    finally:
+        configure(saved)
+
+    return rows
+
+
+def bench_item_collision(samples: int = 20000, calls: int = 2000, frames: int = 600, seed: int = 0) -> dict:
+    """
+    Compare item pickup by bounding rects with the pixel masks behind them.
+    Accuracy: of samples player positions whose rect overlaps an item, the
+    share the masks reject (a pickup on transparent pixels). Cost: one
+    check_collision() with an item under the player's rect (the mask test
+    runs) and with none (only the rect broadphase runs), and the mean frame
+    time of the frame benchmark, each with PIXEL_COLLISION off and on.
+    """
+    from simulation import item_hits
+    from sprites import Items
+    import screens
+
+    saved = snapshot()
+    rng = Random(seed)
+    try:
+        screens.init_display()
+        player = Player()
+        item = Items(Constants._screen_w() // 2, Constants._screen_h() // 2)
+        items = pygame.sprite.Group(item)
+        no_platforms = pygame.sprite.Group()
+
+        # Player top-lefts from which the two rects overlap.
+        positions = [
+            (
+                rng.randint(item.rect.left - player.rect.width + 1, item.rect.right - 1),
+                rng.randint(item.rect.top - player.rect.height + 1, item.rect.bottom - 1),
+            )
+            for _ in range(samples)
+        ]
+        touching = 0
+        for position in positions:
+            player.rect.topleft = position
+            touching += bool(item_hits(player, items))
+
+        row = {"samples": samples, "pixel_hit_rate": touching / samples, "false_pickups_removed": 1 - touching / samples}
+
+        # The item is never collected: check_collision() would release it, so the group is restored each call.
+        over = player.rect.copy()
+        over.center = item.rect.center
+        clear = over.move(0, -Constants._screen_h() // 4)
+
+        modes = (("rect", False), ("pixel", True))
+        for name, enabled in modes:
+            configure({"PIXEL_COLLISION": enabled})
+            for case, rect in (("hit", over), ("miss", clear)):
+                def check() -> None:
+                    player.rect.update(rect)
+                    player.previous_rect.update(rect)
+                    player.check_collision(no_platforms, items, set(), 0)
+                    if not item.alive():
+                        items.add(item)
+
+                row[f"{name}_{case}_us"] = _time_per_call(check, calls, _ROUNDS)
+
+        # The same seeded game in both modes, alternated so drift on the machine hits both; the fastest round is kept.
+        configure({"SEED": seed})
+        for _ in range(_FRAME_ROUNDS):
+            for name, enabled in modes:
+                configure({"PIXEL_COLLISION": enabled})
+                frame_us = bench_frames(frames, seed)
+                row[f"{name}_frame_us"] = min(row.get(f"{name}_frame_us", frame_us), frame_us)
+
+        player.kill()
+        item.kill()
+        return row
+
+    finally:
+        configure(saved)
+
+
+def bench_vec_env(worker_counts: tuple = (1, 2, 4), num_envs: int = 16, steps: int = 200, frame_scale: int = None, seed: int = 0) -> list[dict]:
+    """
+    Step num_envs games of vec_env.VecEnv with random drags for each worker
+    count and report environment steps per second. Games that end are reset
+    in one batched call, as a training loop would.
+    """
+    from vec_env import VecEnv
+    import numpy as np
+
+    rows = []
+    for workers in worker_counts:
+        rng = np.random.default_rng(seed)
+        reach = Constants._max_jump() * Constants._jump_factor()
+        with VecEnv(num_envs, workers, seed, frame_scale) as env:
+            env.reset()
+            start = perf_counter()
+            for _ in range(steps):
+                _, _, dones = env.step(rng.uniform((-reach, -reach // 4), (reach, reach), (num_envs, 2)))
+                if dones.any():
+                    env.reset(np.flatnonzero(dones))
+            elapsed = perf_counter() - start
+
+        rows.append({
+            "workers": workers,
+            "envs": num_envs,
+            "steps_per_second": steps * num_envs / elapsed,
+            "batch_us": elapsed / steps * 1e6,
+        })
+
+    return rows
+
+
+def run_suite(
+        platform_counts: tuple = (8, 32, 128),
+        resolutions: tuple = ((800, 600), (1920, 1080)),
+        tower_counts: tuple = (10, 100, 1000, 10000),
+        windows: tuple = ((800, 600), (1920, 1080), (3840, 2160)),
+        calls: int = 2000,
+        frames: int = 600,
+        seed: int = 0
+        ) -> dict:
+    """
+    Run every hot-path case plus the collision scaling benchmark and return
+    JSON-ready results.
+    """
+    cases = {}
+    for num_platforms in platform_counts:
+        for width, height in resolutions:
+            key = f"{num_platforms}p_{width}x{height}"
+            cases[key] = bench_hot_paths(num_platforms, (width, height), calls, frames, seed)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "calls": calls,
+            "frames": frames,
+            "seed": seed,
+        },
+        "cases": cases,
+        "collision_scaling": bench_collision(tuple(tower_counts), calls, seed),
+        "layout_scaling": bench_layout((Constants._num_platforms(),) + tuple(tower_counts), calls, seed),
+        "window_scaling": bench_window_scaling(tuple(windows), frames, seed),
+        "item_collision": bench_item_collision(calls=calls, frames=frames, seed=seed),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Return a line for every benchmark that is more than threshold (a fraction)
+    slower than in baseline. Benchmarks missing from either run are skipped.
+    """
+    regressions = []
+    for key, case in results["cases"].items():
+        for name, value in case.items():
+            before = baseline.get("cases", {}).get(key, {}).get(name)
+            if before and value > before * (1 + threshold):
+                regressions.append(f"{key} {name}: {before:.2f} -> {value:.2f} us (+{value / before - 1:.0%})")
+
+    return regressions
+
+
+def _rss_bytes() -> int:
+    """
+    Current resident set size, falling back to the peak where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def soak_restarts(restarts: int = 10000, samples: int = 10) -> list[dict]:
+    """
+    Play and lose restarts games back to back through the state machine in main.py,
+    restarting from the Game Over screen each time. Return RSS samples taken
+    evenly over the run; a flat series means restarts do not leak.
+    """
+    with _scratch_files():
+        return _run_restarts(restarts, samples)
+
+
+def _run_restarts(restarts: int, samples: int) -> list[dict]:
+    import main
+    import screens
+
+    screens.init_display()
+    game = main.Game()
+    game.state = main.PlayingState(game)
+    game.state.enter()
+    step_time = settings.step_time
+
+    results = []
+    for restart in range(restarts + 1):
+        # Drop the player just above the bottom of the screen so the next step loses the game.
+        player = game.state.player
+        player.rect.bottom = Constants._screen_h() - 1
+        player.jump((0, Constants._max_velocity()))
+        while not isinstance(game.state, main.GameOverState):
+            game.run_frame(step_time, [])
+
+        click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=game.state.button_rect.center, button=1)
+        game.run_frame(step_time, [click])
+
+        if restart % max(1, restarts // samples) == 0:
+            gc.collect()
+            results.append({
+                "restarts": restart,
+                "rss_mb": _rss_bytes() / 2**20,
+                "platform_pool": platform_pool.stats(),
+                "item_pool": item_pool.stats(),
+            })
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks for the game's hot paths.")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=600, help="frames timed per case for the frame benchmark")
+    parser.add_argument("--platforms", type=int, nargs="+", default=[8, 32, 128], help="platforms per screen")
+    parser.add_argument("--resolutions", nargs="+", default=["800x600", "1920x1080"], metavar="WxH")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000], help="tower sizes for collision scaling")
+    parser.add_argument("--windows", nargs="+", default=["800x600", "1920x1080", "3840x2160"], metavar="WxH", help="window sizes the game is scaled to")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the results to PATH")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if slower than the results in BASELINE")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown as a fraction (default 0.2)")
+    parser.add_argument("--soak", type=int, metavar="RESTARTS", help="run the restart soak test instead")
+    parser.add_argument("--vec-env", type=int, metavar="ENVS", help="time the vectorized environment with ENVS games instead")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker processes tried by --vec-env")
+    parser.add_argument("--frame-scale", type=int, help="include observation frames shrunk by this factor in --vec-env")
+    args = parser.parse_args()
+
+    if args.vec_env:
+        print(f"{os.cpu_count()} cores")
+        print(f"{'workers':>8} {'envs':>6} {'steps/s':>10} {'batch us':>10}")
+        for row in bench_vec_env(tuple(args.workers), args.vec_env, max(1, args.frames // 3), args.frame_scale, args.seed):
+            print(f"{row['workers']:>8} {row['envs']:>6} {row['steps_per_second']:>10.0f} {row['batch_us']:>10.0f}")
+        return
+
+    if args.soak:
+        for row in soak_restarts(args.soak):
+            pool = row["platform_pool"]
+            print(
+                f"{row['restarts']:>8} restarts  {row['rss_mb']:8.1f} MB RSS  "
+                f"platforms: {pool['live']} live, {pool['peak_live']} peak, {pool['reuse_rate']:.1%} reused"
+            )
+        return
+
+    resolutions = [tuple(int(size) for size in resolution.split("x")) for resolution in args.resolutions]
+    windows = [tuple(int(size) for size in window.split("x")) for window in args.windows]
+    results = run_suite(tuple(args.platforms), tuple(resolutions), tuple(args.counts), tuple(windows), args.calls, args.frames, args.seed)
+
+    names = list(next(iter(results["cases"].values())))
+    print(f"{'case':>16} " + " ".join(f"{name:>18}" for name in names) + "   (us per call)")
+    for key, case in results["cases"].items():
+        print(f"{key:>16} " + " ".join(f"{case[name]:>18.2f}" for name in names))
+
+    print(f"\n{'platforms':>10} {'linear us':>10} {'indexed us':>11}")
+    for row in results["collision_scaling"]:
+        print(f"{row['platforms']:>10} {row['linear_us']:>10.2f} {row['indexed_us']:>11.2f}")
+
+    print(f"\n{'platforms':>10} {'layout us':>10} {'us/platform':>12}")
+    for row in results["layout_scaling"]:
+        print(f"{row['platforms']:>10} {row['layout_us']:>10.2f} {row['per_platform_us']:>12.2f}")
+
+    print(f"\n{'window':>10} {'scale':>6} {'frame us':>9} {'rescales':>9} {'whole-frame scale us':>21}")
+    for row in results["window_scaling"]:
+        print(f"{row['window']:>10} {row['scale']:>6.2f} {row['frame_us']:>9.1f} {row['rescales']:>9} {row['whole_frame_scale_us']:>21.1f}")
+
+    row = results["item_collision"]
+    print(
+        f"\nitem pickup: {row['false_pickups_removed']:.1%} of rect overlaps are transparent pixels only"
+        f"\n{'collision':>10} {'hit us':>8} {'miss us':>8} {'frame us':>9}"
+    )
+    for name in ("rect", "pixel"):
+        print(f"{name:>10} {row[f'{name}_hit_us']:>8.2f} {row[f'{name}_miss_us']:>8.2f} {row[f'{name}_frame_us']:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+from constants import Constants
+from typing import Any
+import argparse
+import json
+import os
+
+# Run-time configuration. The defaults are the class attributes of Constants;
+# a deployment can override any of them, once, at startup:
+#   difficulty < config file < environment < command line
+# e.g.  JUMPGAME_SCREEN_WIDTH=1280 python main.py --difficulty hard --set NUM_PLATFORMS=10
+# Overrides are validated and written back onto Constants, so the accessor
+# classmethods keep working. The hot paths read the flat `settings` object
+# instead, which also holds the precomputed derived values.
+
+_ENV_PREFIX = "JUMPGAME_"
+
+# Difficulty presets, selected with --difficulty or JUMPGAME_DIFFICULTY.
+DIFFICULTIES = {
+    "easy": {"NUM_PLATFORMS": 10, "GRAVITY": 0.4, "PLATFORM_WIDTH": 130},
+    "normal": {},
+    "hard": {"NUM_PLATFORMS": 6, "GRAVITY": 0.6, "PLATFORM_WIDTH": 80, "MAX_JUMP_STRENGTH": 18},
+}
+
+# Allowed ranges (inclusive); None leaves a side open. Unlisted numbers must not be negative.
+_LIMITS = {
+    "SCREEN_WIDTH": (320, None),
+    "SCREEN_HEIGHT": (240, None),
+    "WINDOW_WIDTH": (1, None),
+    "WINDOW_HEIGHT": (1, None),
+    "FPS": (1, None),
+    "PHYSICS_HZ": (1, None),
+    "NUM_PLATFORMS": (2, None),     # refresh_screen() generates one fewer than this.
+    "EVEN": (1, None),
+    "GRAVITY": (0.01, None),
+    "MAX_VELOCITY": (1, None),      # Below a pixel per step, a falling player would never move.
+    "GENERATOR_ATTEMPTS": (1, None),
+    "JUMP_REDUCTION_FACTOR": (1, None),
+    "SPATIAL_CELL_SIZE": (1, None),
+    "TEXT_CACHE_SIZE": (1, None),
+    "PROFILE_FRAMES": (1, None),
+    "PROFILE_REFRESH": (1, None),
+    "LEADERBOARD_SIZE": (1, None),
+    "AUTOPLAY_REPORT": (1, None),
+    "SEED": (0, 2**64 - 1),         # Stored as 64 bits in jump recordings.
+    "PREVIEW_SPACING": (1, None),
+    "PREVIEW_DOTS": (1, None),
+    "PREVIEW_DOT": (1, None),
+    "ENV_TICKS": (1, None),
+    "ENV_MAX_TICKS": (1, None),
+    "ENV_FRAME_SCALE": (1, None),
+    "ENV_RING": (1, None),
+    "MOUSE_CLICK_X": (0, 1),
+    "MOUSE_CLICK_Y": (0, 1),
+    "CAMERA_FOLLOW": (0, 1),
+    "BG_VOLUME": (0, 1),
+    "ITEM_VOLUME": (0, 1),
+}
+
+# Optional settings (None by default) that take any number; the others take an integer.
+_OPTIONAL_NUMBERS = {"AUTOPLAY_SECONDS"}
+
+
+class ConfigError(ValueError):
+    """
+    Raised with every invalid override listed, one per line.
+    """
+
+
+class Settings:
+    """
+    Every Constants value as a plain lower-case attribute (Constants._GRAVITY
+    is settings.gravity), plus derived values. Rebuilt by configure(); the
+    object itself is never replaced, so modules can keep a reference to it.
+    """
+
+    def __init__(self):
+        self.refresh()
+
+    def refresh(self) -> None:
+        for name in _names():
+            setattr(self, name.lower(), getattr(Constants, f"_{name}"))
+
+        # Derived values.
+        self.wrap_right = self.screen_width + self.player_width / 2     # Wrap when the player's right passes this.
+        self.wrap_left = 0 - self.player_width / 2                      # ...or its left passes this.
+        self.platform_x_max = self.screen_width - self.platform_width
+        self.platform_y_max = self.screen_height - self.platform_height
+        self.step_time = 1 / self.physics_hz
+        self.start_button = (
+            self.screen_width // 2 - self.display_offset,
+            self.screen_height // 2,
+            self.button_width,
+            self.button_height,
+        )
+        self.restart_button = (
+            self.screen_width // 2 - self.display_offset,
+            self.screen_height // 2 + self.button_height,
+            self.button_width,
+            self.button_height,
+        )
+
+
+def _names() -> list[str]:
+    """
+    Names of the configurable values: the upper-case attributes of Constants, without the underscore.
+    """
+    return [name[1:] for name in vars(Constants) if name[1:].isupper() and name.startswith("_") and not name.startswith("__")]
+
+
+def _parse(text: str) -> Any:
+    """
+    Read an environment or command-line value: JSON where possible (numbers,
+    true/false, null, lists), otherwise the plain string.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _coerce(name: str, value: Any) -> Any:
+    """
+    Return value converted to the type of the built-in default, or raise ValueError.
+    """
+    default = _DEFAULTS[name]
+
+    if default is None:
+        # Optional settings take a number (an integer unless listed in _OPTIONAL_NUMBERS), or null to leave them unset.
+        if value is None:
+            return value
+        if name in _OPTIONAL_NUMBERS:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("expected a number or null")
+            return float(value)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError("expected an integer or null")
+        return value
+
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ValueError("expected true or false")
+        return value
+
+    if isinstance(default, int):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError("expected an integer")
+        return value
+
+    if isinstance(default, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("expected a number")
+        return float(value)
+
+    if isinstance(default, tuple):
+        if not isinstance(value, (list, tuple)) or len(value) != len(default):
+            raise ValueError(f"expected a list of {len(default)} values")
+        if not all(isinstance(part, int) and 0 <= part <= 255 for part in value):
+            raise ValueError("expected colour components from 0 to 255")
+        return tuple(value)
+
+    if isinstance(default, str):
+        if not isinstance(value, str):
+            raise ValueError("expected a string")
+        return value
+
+    raise ValueError("cannot be configured")
+
+
+def validate(overrides: dict) -> dict:
+    """
+    Return overrides with canonical names and coerced values. Raise ConfigError
+    listing every unknown name, bad type, out-of-range value and inconsistency.
+    """
+    names = set(_names())
+    clean = {}
+    problems = []
+
+    for key, value in overrides.items():
+        name = key.upper().lstrip("_")
+        if name not in names:
+            problems.append(f"{key}: unknown setting")
+            continue
+
+        try:
+            value = _coerce(name, value)
+        except ValueError as error:
+            problems.append(f"{key}: {error} (got {value!r})")
+            continue
+
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            low, high = _LIMITS.get(name, (0, None))
+            if (low is not None and value < low) or (high is not None and value > high):
+                problems.append(f"{key}: {value} is outside {low}..{'' if high is None else high}")
+                continue
+
+        clean[name] = value
+
+    # Checks between values, on the merged result.
+    merged = {name: getattr(Constants, f"_{name}") for name in names}
+    merged.update(clean)
+    if merged["PLATFORM_WIDTH"] > merged["SCREEN_WIDTH"]:
+        problems.append("PLATFORM_WIDTH must not exceed SCREEN_WIDTH")
+    if merged["PLATFORM_TOP_LIMIT"] > merged["SCREEN_HEIGHT"] - merged["PLATFORM_HEIGHT"]:
+        problems.append("PLATFORM_TOP_LIMIT must leave room for a platform above the bottom of the screen")
+    if merged["PLAYER_WIDTH"] > merged["SCREEN_WIDTH"] or merged["PLAYER_HEIGHT"] > merged["SCREEN_HEIGHT"]:
+        problems.append("the player must fit on the screen")
+
+    if problems:
+        raise ConfigError("\n".join(problems))
+
+    return clean
+
+
+def configure(overrides: dict) -> Settings:
+    """
+    Validate overrides, apply them to Constants and rebuild settings. Nothing
+    is applied if any override is invalid.
+    """
+    for name, value in validate(overrides).items():
+        setattr(Constants, f"_{name}", value)
+
+    settings.refresh()
+    return settings
+
+
+def snapshot() -> dict:
+    """
+    Return the current value of every setting, for restoring with configure().
+    """
+    return {name: getattr(Constants, f"_{name}") for name in _names()}
+
+
+def overridden() -> dict:
+    """
+    Return the settings that differ from the built-in defaults, as JSON-ready values.
+    """
+    return {name: list(value) if isinstance(value, tuple) else value for name, value in snapshot().items() if value != _DEFAULTS[name]}
+
+
+def defaults() -> dict:
+    """
+    Return the built-in value of every setting, for configure().
+    """
+    return dict(_DEFAULTS)
+
+
+def load_config(argv: list = None, environ: dict = None) -> Settings:
+    """
+    Collect overrides from a difficulty preset, a JSON config file, JUMPGAME_* environment
+    variables and --set NAME=VALUE arguments, in that order, and apply them once.
+    """
+    environ = os.environ if environ is None else environ
+
+    parser = argparse.ArgumentParser(description="Jump King x Doodle Jump")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default=environ.get(f"{_ENV_PREFIX}DIFFICULTY"))
+    parser.add_argument("--config", metavar="PATH", default=environ.get(f"{_ENV_PREFIX}CONFIG"), help="JSON file of settings")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override one setting")
+    args = parser.parse_args(argv)
+
+    if args.difficulty is not None and args.difficulty not in DIFFICULTIES:
+        # argparse only checks choices given on the command line, not the environment default.
+        parser.error(f"{_ENV_PREFIX}DIFFICULTY must be one of {', '.join(sorted(DIFFICULTIES))}, got {args.difficulty!r}")
+
+    overrides = {}
+    if args.difficulty:
+        overrides.update(DIFFICULTIES[args.difficulty])
+
+    if args.config:
+        with open(args.config) as file:
+            overrides.update(json.load(file))
+
+    for key, value in environ.items():
+        if key.startswith(_ENV_PREFIX) and key not in (f"{_ENV_PREFIX}DIFFICULTY", f"{_ENV_PREFIX}CONFIG"):
+            overrides[key[len(_ENV_PREFIX):]] = _parse(value)
+
+    for assignment in args.set:
+        name, separator, value = assignment.partition("=")
+        if not separator:
+            parser.error(f"--set expects NAME=VALUE, got {assignment!r}")
+        overrides[name] = _parse(value)
+
+    try:
+        return configure(overrides)
+    except ConfigError as error:
+        parser.error(f"invalid settings:\n{error}")
+
+
+# The built-in values, which fix the type of each setting.
+_DEFAULTS = snapshot()
+
+# Built from the Constants defaults at import, so code that never calls load_config() still works.
+settings = Settings()
@@ -6,7 +6,13 @@ class Constants:
     _BG_VOLUME = 0.5
     _SCREEN_WIDTH = 800
     _SCREEN_HEIGHT = 600
-    _FPS = 60
+    _RESIZABLE = False    # Let the window be resized; the game is scaled to fit it, keeping its aspect ratio.
+    _WINDOW_WIDTH = None    # Starting window size; None opens it at the screen size above.
+    _WINDOW_HEIGHT = None
+    _FPS = 60    # Render rate cap.
+    _PHYSICS_HZ = 60    # Fixed physics step rate; gameplay constants are tuned per step.
+    _MAX_FRAME_TIME = 0.25    # Seconds of frame time banked at most per frame.
+    _DIRTY_RENDERING = True    # Redraw only changed regions instead of full frames.
     _GRAVITY = 0.5
     _PLAYER_WIDTH = 50
     _PLAYER_HEIGHT = 50
@@ -15,10 +21,15 @@ class Constants:
     _PLATFORM_TOP_LIMIT = 30
     _NUM_PLATFORMS = 8
     _PLATFORM_COLLISION_BUFFER = 20
+    _PLATFORM_GAP = 10    # Minimum clear pixels around each generated platform.
+    _GENERATOR_ATTEMPTS = 12    # Random tries for a clear spot before every row of the band is searched.
+    _SPATIAL_CELL_SIZE = 128    # Grid cell size (pixels) of the collision index.
     _ITEM_SCORE = 5
     _ITEM_VOLUME = 0.9
+    _SOUND_CHANNELS = 4    # Mixer channels reserved for sound effects.
     _PLATFORM_SCORE = 1
     _ITEM_SIZE = 25
+    _PIXEL_COLLISION = True    # Collect items only when opaque pixels touch; False uses the bounding rects.
     _ITEM_XOFFSET = 38
     _ITEM_YOFFSET = 30
     _MAX_JUMP_STRENGTH = 20
@@ -29,10 +40,12 @@ class Constants:
     _EVEN = 2
     _BUTTON_WIDTH = 200
     _BUTTON_HEIGHT = 50
+    _PROGRESS_BORDER = 2    # Outline width of the start button while assets load.
     _LIGHT_GREEN = (128, 239, 128)
     _DISPLAY_OFFSET = 100
     _LARGE_FONT = 55
     _SMALL_FONT = 30
+    _TEXT_CACHE_SIZE = 128    # Rendered text surfaces kept by the LRU cache.
     _WHITE = (255, 255, 255)
     _DARK_RED = (128, 0, 32)
     _RED = (255, 0, 0)
@@ -45,6 +58,29 @@ class Constants:
     _LINE_SPACING = 60
     _ENLARGED_SPRITE_EXTENSION = 30
     _TRANSITION_TIME = 0.5    # Seconds
+    _INFINITE_SCROLL = False    # Scroll through a streamed tower instead of switching screens.
+    _STREAM_AHEAD = 1200    # Pixels above the player that must already be generated.
+    _CAMERA_FOLLOW = 0.4    # Fraction of the screen kept above the player while climbing.
+    _SEED = None    # Layout seed for every game; None picks a new seed per game.
+    _RECORDING_FILE = "lastGame.rec"    # Jump recording of the most recent game.
+    _SCORE_FILE = "highScore.csv"
+    _LEADERBOARD_SIZE = 10    # Games kept on the leaderboard.
+    _PROFILE = False    # Time each frame phase from start-up (F3 also turns it on).
+    _PROFILE_FRAMES = 600    # Frames kept in the profiler's ring buffer.
+    _PROFILE_REFRESH = 30    # Frames between overlay redraws.
+    _PROFILE_FONT = 20
+    _PROFILE_EXPORT = "frameProfile.csv"    # Written on exit; use a .json name for JSON.
+    _PREVIEW = True    # Show the aiming trajectory and landing platform while dragging.
+    _PREVIEW_SPACING = 4    # Physics steps between trajectory dots, at least.
+    _PREVIEW_DOTS = 20  # Most trajectory dots drawn; longer jumps space them further apart.
+    _PREVIEW_DOT = 3    # Trajectory dot radius and landing outline width.
+    _AUTOPLAY = False    # Let the built-in bot play, with no frame-rate cap.
+    _AUTOPLAY_SECONDS = None    # Stop the bot after this many seconds; None plays until the window is closed.
+    _AUTOPLAY_REPORT = 10    # Seconds between the bot's throughput reports.
+    _ENV_TICKS = None    # Physics steps per vectorized-environment step; None runs each jump until the player lands.
+    _ENV_MAX_TICKS = 600    # Most physics steps a single environment step runs.
+    _ENV_FRAME_SCALE = None    # Observation frames are the screen shrunk by this factor; None leaves them out.
+    _ENV_RING = 4    # Observation slots in the shared ring buffer.
 
     @classmethod
     def _bg_vol(cls):
@@ -62,6 +98,18 @@ class Constants:
     def _fps(cls):
         return cls._FPS
 
+    @classmethod
+    def _physics_hz(cls):
+        return cls._PHYSICS_HZ
+
+    @classmethod
+    def _max_frame_time(cls):
+        return cls._MAX_FRAME_TIME
+
+    @classmethod
+    def _dirty_render(cls):
+        return cls._DIRTY_RENDERING
+
     @classmethod
     def _grav(cls):
         return cls._GRAVITY
@@ -94,6 +142,10 @@ class Constants:
     def _platform_collision_buf(cls):
         return cls._PLATFORM_COLLISION_BUFFER
 
+    @classmethod
+    def _spatial_cell(cls):
+        return cls._SPATIAL_CELL_SIZE
+
     @classmethod
     def _item_score(cls):
         return cls._ITEM_SCORE
@@ -102,6 +154,10 @@ class Constants:
     def _item_vol(cls):
         return cls._ITEM_VOLUME
 
+    @classmethod
+    def _sound_channels(cls):
+        return cls._SOUND_CHANNELS
+
     @classmethod
     def _platform_score(cls):
         return cls._PLATFORM_SCORE
@@ -166,6 +222,10 @@ class Constants:
     def _sm_font(cls):
         return cls._SMALL_FONT
     
+    @classmethod
+    def _text_cache_size(cls):
+        return cls._TEXT_CACHE_SIZE
+
     @classmethod
     def _white(cls):
         return cls._WHITE
@@ -212,4 +272,128 @@ class Constants:
 
     @classmethod
     def _screen_change(cls):
-        return cls._TRANSITION_TIME
\ No newline at end of file
+        return cls._TRANSITION_TIME
+
+    @classmethod
+    def _infinite_scroll(cls):
+        return cls._INFINITE_SCROLL
+
+    @classmethod
+    def _stream_ahead(cls):
+        return cls._STREAM_AHEAD
+
+    @classmethod
+    def _camera_follow(cls):
+        return cls._CAMERA_FOLLOW
+
+    @classmethod
+    def _seed(cls):
+        return cls._SEED
+
+    @classmethod
+    def _recording_file(cls):
+        return cls._RECORDING_FILE
+
+    @classmethod
+    def _profile(cls):
+        return cls._PROFILE
+
+    @classmethod
+    def _profile_frames(cls):
+        return cls._PROFILE_FRAMES
+
+    @classmethod
+    def _profile_refresh(cls):
+        return cls._PROFILE_REFRESH
+
+    @classmethod
+    def _profile_font(cls):
+        return cls._PROFILE_FONT
+
+    @classmethod
+    def _profile_export(cls):
+        return cls._PROFILE_EXPORT
+
+    @classmethod
+    def _score_file(cls):
+        return cls._SCORE_FILE
+
+    @classmethod
+    def _leaderboard_size(cls):
+        return cls._LEADERBOARD_SIZE
+
+    @classmethod
+    def _progress_border(cls):
+        return cls._PROGRESS_BORDER
+
+    @classmethod
+    def _platform_gap(cls):
+        return cls._PLATFORM_GAP
+
+    @classmethod
+    def _generator_attempts(cls):
+        return cls._GENERATOR_ATTEMPTS
+
+    @classmethod
+    def _autoplay(cls):
+        return cls._AUTOPLAY
+
+    @classmethod
+    def _autoplay_seconds(cls):
+        return cls._AUTOPLAY_SECONDS
+
+    @classmethod
+    def _autoplay_report(cls):
+        return cls._AUTOPLAY_REPORT
+
+    @classmethod
+    def _preview(cls):
+        return cls._PREVIEW
+
+    @classmethod
+    def _preview_spacing(cls):
+        return cls._PREVIEW_SPACING
+
+    @classmethod
+    def _preview_dots(cls):
+        return cls._PREVIEW_DOTS
+
+    @classmethod
+    def _preview_dot(cls):
+        return cls._PREVIEW_DOT
+
+    @classmethod
+    def _light_green(cls):
+        return cls._LIGHT_GREEN
+
+    @classmethod
+    def _resizable(cls):
+        return cls._RESIZABLE
+
+    @classmethod
+    def _window_w(cls):
+        return cls._WINDOW_WIDTH
+
+    @classmethod
+    def _window_h(cls):
+        return cls._WINDOW_HEIGHT
+
+    @classmethod
+    def _env_ticks(cls):
+        return cls._ENV_TICKS
+
+    @classmethod
+    def _env_max_ticks(cls):
+        return cls._ENV_MAX_TICKS
+
+    @classmethod
+    def _env_frame_scale(cls):
+        return cls._ENV_FRAME_SCALE
+
+    @classmethod
+    def _env_ring(cls):
+        return cls._ENV_RING
+
+    @classmethod
+    def _pixel_collision(cls):
+        return cls._PIXEL_COLLISION
\ No newline at end of file
@@ -1,59 +1,33 @@
-from constants import Constants
-from sprites import Platform, Items
-from random import randint
-import math
+from sprites import platform_pool, item_pool
+from simulation import generate_layout, restart_screen, calculate_vector
+from spatial_index import SpatialGroup
+from scores import score_store
 from typing import Any
-import pygame
 
 
-def generate_platforms(num_platforms: int) -> tuple[Any, Any, Any, Any]:
+def generate_platforms(num_platforms: int, rng: Any = None, start: tuple = None) -> tuple[Any, Any, Any, Any]:
     """
     Randomly generate rectangle platforms and return:
     platform_sprites.Group: Any, item_sprites.Group: Any, lowest_platform.sprite: Any, highest_platform.sprite: Any
+    The layout itself comes from simulation.generate_layout(), drawn from rng when given,
+    and climbable from the platform at start (x, y) when given.
     """
 
-    platform_sprites = pygame.sprite.Group()
-    item_sprites = pygame.sprite.Group()
-    lowest_y = 0
-    highest_y = Constants._screen_h()
-    lowest_platform = None
-    highest_platform = None
-    lowest_item = None
+    platform_positions, item_positions, lowest_index, highest_index = generate_layout(num_platforms, rng, start)
+    platform_sprites, item_sprites = _layout_sprites(platform_positions, item_positions)
+    platforms = platform_sprites.sprites()
 
-    for i in range(num_platforms):
+    return platform_sprites, item_sprites, platforms[lowest_index], platforms[highest_index]
 
-        x = randint(0, Constants._screen_w() - Constants._platform_w())
-        y = randint(Constants._platform_max(), Constants._screen_h() - Constants._platform_h())
-        platform = Platform(x, y)  # Object / isntantiation of platform class.
 
-        # Adding the instanced platform to the group Platform.
-        platform_sprites.add(platform)
-
-        # Generate a random number check. If it's even, create an item platform.
-        if (randint(0, Constants._screen_w()) % Constants._even()) or (i == 0):
-            # For the i == 0 case, we need to create at least one item for lowest_item.
-            item = Items(x + Constants._item_xoffset(), y - Constants._item_yoffset())
-
-        # Try to add items. If item was not created during this loop - pass.
-        try:
-            item_sprites.add(item)
-        except:
-            pass
-
-        if y > lowest_y:
-            lowest_y = y  # Update the if-condition for every for-loop iteration.
-            lowest_platform = platform  # Update the future return value.
-            try:
-                lowest_item = item  # Keep track of lowest item.
-            except:
-                pass
-
-        if y < highest_y:
-            highest_y = y
-            highest_platform = platform
-
-    lowest_item.kill() # Remove the item from the player's starting platform.
-    return platform_sprites, item_sprites, lowest_platform, highest_platform
+def _layout_sprites(platform_positions: list, item_positions: list) -> tuple[Any, Any]:
+    """
+    Return sprite groups of platforms and items at the given positions, in position order.
+    """
+    # Platforms and items come from the pools, so old instances are reused when available.
+    platform_sprites = SpatialGroup([platform_pool.acquire(x, y) for x, y in platform_positions])
+    item_sprites = SpatialGroup([item_pool.acquire(x, y) for x, y in item_positions])
+    return platform_sprites, item_sprites
 
 
 def refresh_screen(
@@ -62,25 +36,26 @@ def refresh_screen(
         platforms: Any, 
         items: Any, 
         touched_platforms: set, 
-        highest_platform: Any
+        highest_platform: Any,
+        rng: Any = None
         ) -> tuple[Any, Any, Any]:
     """
     Once the player reaches the top platform on screen, translate player position and platform position to the bottom of the screen.
-    Then, generate new platforms above it. New platform attributes get reset manually before function return.
+    Then, generate new platforms above it. The new layout comes from simulation.restart_screen(),
+    shared with the headless game; this only swaps the sprites.
     """
-    # Set the player's position to the bottom of the screen.
-    new_player_bottom = Constants._screen_h() - Constants._platform_h()
-    player.rect.bottom = new_player_bottom  # Preserves player x-location, changing y.
-
-    # Create a new platform at the bottom of the screen with the same x position as the highest platform.
-    restart_platform = Platform(highest_platform.rect.x, Constants._screen_h() - Constants._platform_h())
+    # Moves the player to the bottom of the screen and lays out the next screen.
+    restart_position, platform_positions, item_positions, highest_index = restart_screen(player, highest_platform, rng)
 
     # Remove all old sprites.
     for platform in platforms.sprites():
-        platform.kill()  # Kill() removes the sprite from all groups and flags it for deletion.
+        platform_pool.release(platform)  # Kills the sprite (removing it from all groups) and keeps it for reuse.
     
     for item in items.sprites():
-        item.kill()
+        item_pool.release(item)
+
+    # Create a new platform at the bottom of the screen with the same x position as the highest platform.
+    restart_platform = platform_pool.acquire(*restart_position)
 
     # Clear the sprite groups.
     touched_platforms.clear()
@@ -88,15 +63,15 @@ def refresh_screen(
     items.empty()
     all_sprites.empty() # Empty() also removes the player, here.
 
-    # Add the restart platform to the groups before generating new platforms.
+    # Add the restart platform to the groups before the new platforms.
     platforms.add(restart_platform)
     all_sprites.add(restart_platform)
     all_sprites.add(player)
 
-    # Generate new platforms and add them to the groups.
-    new_platforms, new_item_sprites, lowest_platform, new_highest_platform = generate_platforms(Constants._num_platforms() - 1)
+    # Create the new platforms and add them to the sprite groups.
+    new_platforms, new_item_sprites = _layout_sprites(platform_positions, item_positions)
+    new_highest_platform = new_platforms.sprites()[highest_index]
 
-    # Add the new platforms to the sprite groups.
     platforms.add(new_platforms)
     all_sprites.add(new_platforms)
     items.add(new_item_sprites)
@@ -109,51 +84,9 @@ def refresh_screen(
     return all_sprites, restart_platform, new_highest_platform
 
 
-def calculate_vector(start_left_click: tuple, end_left_click: tuple) -> tuple[float, float]:
+def save_score(score: int, run: dict = None) -> int:
     """
-    Return a tuple where each vector element carries a magnitude and radian position.
+    Record the score (with optional run metadata) on the leaderboard and return the high score.
+    The leaderboard is written to highScore.csv in the background by scores.score_store.
     """
-
-    dx = end_left_click[Constants._mouse_click_x()] - start_left_click[Constants._mouse_click_x()]
-    dy = end_left_click[Constants._mouse_click_y()] - start_left_click[Constants._mouse_click_y()]
-    distance = math.sqrt(dx * dx + dy * dy)
-
-    # Scale the jump strength.
-    strength = min(distance / Constants._jump_factor(), Constants._max_jump())
-    angle = math.atan2(dy, dx)
-
-    # Invert x-axis for leftward jump.
-    vector_x = -strength * math.cos(angle)
-
-    # Invert y-axis for upward jump.
-    vector_y = -strength * math.sin(angle)
-
-    return (vector_x, vector_y)
-
-
-def save_score(score: int) -> int:
-    """
-    Creates and reads the highscore from an excel file.
-    """
-
-    # Read the existing score from the file.
-    try:
-        with open("highScore.csv", "r") as csvfile:
-            content = csvfile.readline()
-            if content:
-                high_score = int(content)
-            else:
-                high_score = 0
-
-    except FileNotFoundError:
-        # If the file does not exist, set the high_score to 0.
-        high_score = 0
-
-    # Check if the new score is higher than the existing high score.
-    if score > high_score:
-        with open("highScore.csv", "w") as csvfile:
-            csvfile.write(str(score))
-
-        return score
-    else:
-        return high_score
\ No newline at end of file
+    return score_store.submit(score, run)
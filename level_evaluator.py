@@ -0,0 +1,181 @@
+from constants import Constants
+from config import configure
+from simulation import calculate_vector, new_game, step
+from reachability import graph_for, predict_landing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from time import perf_counter
+from typing import Any
+import argparse
+import json
+import os
+import random
+
+# Monte Carlo evaluation of generated levels. Each run generates a layout,
+# plays it headlessly with sampled calculate_vector() jumps and records
+# whether the screen was cleared. Runs are spread over a process pool, and
+# every task applies its own Constants overrides inside the worker process.
+
+_TUNABLE = ("_NUM_PLATFORMS", "_MAX_JUMP_STRENGTH", "_JUMP_REDUCTION_FACTOR")
+_CANDIDATE_JUMPS = 16   # Jumps sampled per decision.
+_MAX_JUMPS = 40         # Decisions allowed before a run counts as stalled.
+_MAX_AIR_TICKS = 600    # Safety cap on a single jump.
+
+
+def _apply(config: dict) -> None:
+    """
+    Override the tunable Constants in this process.
+    """
+    configure(config)
+
+
+def sample_drag(rng: Any) -> tuple[int, int]:
+    """
+    Sample a slingshot drag: mostly pulling down (to jump up), in any direction sideways.
+    """
+    reach = Constants._max_jump() * Constants._jump_factor()
+    return rng.randint(-reach, reach), rng.randint(-reach // 4, reach)
+
+
+def _choose_jump(state: Any, rng: Any) -> tuple[float, float]:
+    """
+    Sample candidate jumps and prefer the highest new platform, then any safe landing.
+    """
+    best_vector = None
+    best_key = None
+
+    for _ in range(_CANDIDATE_JUMPS):
+        vector = calculate_vector((0, 0), sample_drag(rng))
+        platform, _ = predict_landing(state.player.rect, vector, state.platforms)
+        if platform is None:
+            continue
+
+        key = (platform not in state.touched_platforms, -platform.rect.top)
+        if best_key is None or key > best_key:
+            best_key = key
+            best_vector = vector
+
+    # Nothing safe was found, so take a blind jump.
+    return best_vector if best_vector is not None else calculate_vector((0, 0), sample_drag(rng))
+
+
+def play_layout(rng: Any, layout_rng: Any = None) -> dict:
+    """
+    Generate one layout from layout_rng and play it until it is cleared, lost or stalled.
+    """
+    state = new_game(layout_rng)
+    difficulty = graph_for(state.platforms).difficulty()
+    jumps = 0
+
+    while jumps < _MAX_JUMPS and not state.game_over and state.screens == 0:
+        step(state, _choose_jump(state, rng))
+        jumps += 1
+
+        ticks = 0
+        while state.player.is_jumping and not state.game_over and ticks < _MAX_AIR_TICKS:
+            step(state)
+            ticks += 1
+
+    return {
+        "cleared": state.screens > 0,
+        "game_over": state.game_over,
+        "jumps": jumps,
+        "score": state.score,
+        "ticks": state.ticks,
+        "winnable": difficulty["winnable"],
+        "min_jumps": difficulty["min_jumps"],
+    }
+
+
+def run_batch(config: dict, seed: int, runs: int) -> list[dict]:
+    """
+    Worker entry point: play runs layouts under config, seeded for reproducibility.
+    """
+    _apply(config)
+    # Separate streams, so the sampled jumps are independent of the layouts they are tried on.
+    layout_rng = random.Random(seed << 1)
+    rng = random.Random((seed << 1) | 1)
+    return [play_layout(rng, layout_rng) for _ in range(runs)]
+
+
+def summarize(results: list[dict]) -> dict:
+    """
+    Reduce per-run results to completion and difficulty statistics.
+    """
+    runs = len(results)
+    cleared = [result for result in results if result["cleared"]]
+    jumps = sorted(result["jumps"] for result in cleared)
+    min_jumps = [result["min_jumps"] for result in results if result["min_jumps"] is not None]
+
+    return {
+        "runs": runs,
+        "completion_rate": len(cleared) / runs,
+        "game_over_rate": sum(result["game_over"] for result in results) / runs,
+        "stall_rate": sum(not result["cleared"] and not result["game_over"] for result in results) / runs,
+        "mean_jumps_to_clear": sum(jumps) / len(jumps) if jumps else None,
+        "p90_jumps_to_clear": jumps[int(0.9 * (len(jumps) - 1))] if jumps else None,
+        "mean_score": sum(result["score"] for result in results) / runs,
+        "winnable_rate": sum(result["winnable"] for result in results) / runs,
+        "mean_min_jumps": sum(min_jumps) / len(min_jumps) if min_jumps else None,
+    }
+
+
+def evaluate(configs: list[dict], runs: int, workers: int = None, chunk: int = 50, seed: int = 0) -> list[dict]:
+    """
+    Evaluate every config with runs layouts each, fanned out over a process pool.
+    Return one summary per config, in order.
+    """
+    tasks = []
+    for index, config in enumerate(configs):
+        for start in range(0, runs, chunk):
+            tasks.append((index, config, seed + index * runs + start, min(chunk, runs - start)))
+
+    results = [[] for _ in configs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(index, pool.submit(run_batch, config, task_seed, count)) for index, config, task_seed, count in tasks]
+        for index, future in futures:
+            results[index].extend(future.result())
+
+    return [dict(config=config, **summarize(result)) for config, result in zip(configs, results)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Monte Carlo evaluation of generated platform layouts.")
+    parser.add_argument("--runs", type=int, default=500, help="layouts played per configuration")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--num-platforms", type=int, nargs="+", default=[Constants._num_platforms()])
+    parser.add_argument("--max-jump", type=int, nargs="+", default=[Constants._max_jump()])
+    parser.add_argument("--jump-factor", type=int, nargs="+", default=[Constants._jump_factor()])
+    parser.add_argument("--json", help="write the summaries to this file")
+    args = parser.parse_args()
+
+    configs = [
+        dict(zip(_TUNABLE, values))
+        for values in product(args.num_platforms, args.max_jump, args.jump_factor)
+    ]
+
+    start = perf_counter()
+    summaries = evaluate(configs, args.runs, args.workers, seed=args.seed)
+    elapsed = perf_counter() - start
+
+    for summary in summaries:
+        config = summary["config"]
+        print(
+            f"platforms={config['_NUM_PLATFORMS']:<3} max_jump={config['_MAX_JUMP_STRENGTH']:<3} "
+            f"factor={config['_JUMP_REDUCTION_FACTOR']:<3} "
+            f"cleared={summary['completion_rate']:.1%} game_over={summary['game_over_rate']:.1%} "
+            f"jumps={summary['mean_jumps_to_clear'] or 0:.1f} score={summary['mean_score']:.1f} "
+            f"winnable={summary['winnable_rate']:.1%} min_jumps={summary['mean_min_jumps'] or 0:.1f}"
+        )
+
+    total = args.runs * len(configs)
+    print(f"{total} runs in {elapsed:.2f}s ({total / elapsed:.0f} runs/s, {args.workers} workers)")
+
+    if args.json:
+        with open(args.json, "w") as jsonfile:
+            json.dump(summaries, jsonfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
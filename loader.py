@@ -0,0 +1,102 @@
+from constants import Constants
+from assets import asset_cache
+from audio import sound_bank
+from time import perf_counter
+from typing import Any
+import threading
+
+# Boot-time asset preloading. Every image, sound effect and the music track
+# is decoded on a worker thread while the start screen is already showing,
+# so the first game starts with everything resident. The loader also keeps
+# the startup timeline: time to the first frame and time until the start
+# button can be pressed.
+
+
+def default_jobs() -> list[tuple[str, Any]]:
+    """
+    Return (name, load function) for every asset the game uses, with the
+    sizes the sprites ask the cache for. The player image is not here: the
+    start screen blits it every frame, and scaling it on this thread would
+    lock it in the middle of a blit. StartState scales it instead.
+    """
+    return [
+        ("background.png", lambda: asset_cache.image("background.png", (Constants._screen_w(), Constants._screen_h()), alpha=False)),
+        ("platform.png", lambda: asset_cache.image("platform.png", (Constants._platform_w(), Constants._platform_h()))),
+        ("strawberry.png", lambda: asset_cache.image("strawberry.png", (Constants._item_size(), Constants._item_size()))),
+        ("denethor.mp3", lambda: sound_bank.load("item_get", "denethor.mp3", Constants._item_vol())),
+        ("testmusic.mp3", lambda: sound_bank.preload_music("testmusic.mp3")),
+    ]
+
+
+class AssetLoader(Constants):
+    """
+    Runs the load jobs on a daemon thread and reports progress. A failed job
+    is recorded and skipped; the asset is then loaded on first use as before.
+    """
+
+    def __init__(self, jobs: list = None):
+        self.jobs = default_jobs() if jobs is None else jobs
+        self.loaded = 0
+        self.failed = {}        # Job name -> error.
+        self.timings = {}       # Job name -> seconds.
+        self.boot_time = perf_counter()
+        self.milestones = {}    # Milestone name -> seconds since boot.
+        self._thread = None
+        self._done = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="asset-loader", daemon=True)
+            self._thread.start()
+
+    def progress(self) -> float:
+        """
+        Fraction of jobs finished, from 0.0 to 1.0.
+        """
+        return self.loaded / len(self.jobs) if self.jobs else 1.0
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until every job has run (starting the loader if needed).
+        """
+        self.start()
+        return self._done.wait(timeout)
+
+    def mark(self, milestone: str) -> None:
+        """
+        Record the first time a startup milestone is reached.
+        """
+        self.milestones.setdefault(milestone, perf_counter() - self.boot_time)
+
+    def metrics(self) -> dict:
+        """
+        Return the startup timeline and per-asset load times in milliseconds.
+        """
+        return {
+            "milestones_ms": {name: seconds * 1000 for name, seconds in self.milestones.items()},
+            "assets_ms": {name: seconds * 1000 for name, seconds in self.timings.items()},
+            "failed": {name: str(error) for name, error in self.failed.items()},
+        }
+
+    def _run(self) -> None:
+        # Whatever happens, the start button must enable and wait() must return.
+        try:
+            for name, job in self.jobs:
+                start = perf_counter()
+                try:
+                    job()
+                except Exception as error:
+                    self.failed[name] = error
+
+                self.timings[name] = perf_counter() - start
+                self.loaded += 1
+        finally:
+            self.mark("assets_loaded")
+            self._done.set()
+
+
+# Started from main.py at boot.
+asset_loader = AssetLoader()
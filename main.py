@@ -1,176 +1,497 @@
 from constants import *
 from sprites import *
 from screens import *
+import screens
 from helper_functions import *
-from sys import exit
-from time import sleep
+from assets import asset_cache
+from audio import sound_bank
+from rendering import DirtyRenderer
+from world import ChunkedWorld
+from replay import JumpRecorder
+import replay
+from profiler import profiler
+from scores import score_store
+from loader import asset_loader
+from config import load_config, overridden, settings
+from autoplay import AutoPlayer
+from simulation import advance, GAME_OVER, NEXT_SCREEN
+from preview import TrajectoryPreview
+from viewport import viewport
+from typing import Any
 import pygame
+import random
 
-# Pygame is initialized in screens.py for easier workflow.
+# Pygame is initialized by screens.init_display() when the game starts.
+# The game is a flat state machine: Game.run() owns a single loop and one
+# active state at a time, and each state is disposed of when it is left.
+# Restarting never nests a new game loop inside the old one.
 
 
-def play() -> None:
+class GameState(Constants):
+    """
+    One screen of the game. Game calls enter() when the state becomes active,
+    handle_event(), update() and draw() once per frame, and dispose() when the
+    state is left for good.
+    """
+
+    def __init__(self, game: Any):
+        self.game = game
+
+    def enter(self) -> None:
+        pass
+
+    def handle_event(self, event: Any) -> None:
+        pass
+
+    def update(self, dt: float) -> None:
+        pass
+
+    def draw(self) -> None:
+        pass
+
+    def dispose(self) -> None:
+        pass
+
+    def invalidate(self) -> None:
+        """
+        Redraw the whole screen next frame (something was drawn over the state).
+        """
+        pass
+
+
+class StartState(GameState):
+    """
+    The start screen, only shown once on boot-up.
+    """
+
+    def __init__(self, game: Any):
+        super().__init__(game)
+        self.button_rect, self.upper_layout, self.lower_layout = start_screen_layout()
+
+        # The start screen draws the original player image, so the sprite's size is made here, not by the loader.
+        asset_cache.image("player.png", (settings.player_width, settings.player_height))
+
+    def enter(self) -> None:
+        asset_loader.start()  # No-op when main already started it.
+
+    def handle_event(self, event: Any) -> None:
+        # The button only works once every asset is loaded, so the game starts without disk reads.
+        if not asset_loader.done():
+            return
+
+        if event.type == pygame.MOUSEBUTTONDOWN and self.button_rect.collidepoint(event.pos):
+            self.game.change(PlayingState(self.game))  # Start the game.
+
+    def invalidate(self) -> None:
+        # The text was rendered for the old window size; lay it out again with the new fonts.
+        self.button_rect, self.upper_layout, self.lower_layout = start_screen_layout()
+
+    def draw(self) -> None:
+        loading = not asset_loader.done()
+        draw_menu(self.button_rect, self.upper_layout, self.lower_layout, asset_loader.progress() if loading else 1.0)
+
+        asset_loader.mark("first_frame")
+        if not loading and "interactive" not in asset_loader.milestones:
+            asset_loader.mark("interactive")
+            if not profiler.enabled:
+                return  # The timeline is still in asset_loader.metrics().
+
+            milestones = asset_loader.metrics()["milestones_ms"]
+            print(
+                f"Startup: first frame {milestones['first_frame']:.0f} ms, "
+                f"interactive {milestones['interactive']:.0f} ms "
+                f"(assets loaded {milestones['assets_loaded']:.0f} ms)"
+            )
+
+
+class PlayingState(GameState):
     """
     Main game loop
     """
-    # Load background image and sprites.
-    background_image = pygame.image.load("background.png").convert()  # Loading image.
-    player = Player()  # Create the player sprite.
-
-    # Set the music.
-    pygame.mixer.init()
-    pygame.mixer.music.load("testmusic.mp3")
-    pygame.mixer.music.set_volume(Constants._bg_vol())
-    pygame.mixer.music.play(-1)
-
-    # Manually choose number of platforms here...
-    platforms, items, lowest_platform, highest_platform = generate_platforms(Constants._num_platforms())
-    player.rect.center = (
-        lowest_platform.rect.centerx,
-        lowest_platform.rect.top - Constants._player_h() // 2,
-    )
-
-    # Move all sprites into one sprite.group for use in the main game loop.
-    all_sprites = pygame.sprite.Group()
-    all_sprites.add(player)
-    all_sprites.add(platforms)
-    all_sprites.add(items)
-
-    # Initialize starting values.
-    dragging = False
-    start_left_click = (0, 0)  # Tuple for the starting mouse position on screen.
-    score = 0
-    game_over = False
-    touched_platforms = set()  # To be used in updating the score.
-
-    # Prevent the score from incrementing when jumping on the starting platform:
-    lowest_platform.was_touched = True
-    touched_platforms.add(lowest_platform)
-
-    while not game_over:
-        # Events are a method in pygame to check for certain conditions.
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:  # Quit = Red x on the top right of the window
-                pygame.quit()
-                exit()
-
-            elif event.type == pygame.MOUSEBUTTONDOWN:  # Left click.
-
-                # If player isn't jumping, allow click.
-                if not player.is_jumping:
-                    dragging = True
-                    start_left_click = pygame.mouse.get_pos()
-
-            elif event.type == pygame.MOUSEBUTTONUP:  # Release left click.
-
-                if dragging:
-                    end_left_click = pygame.mouse.get_pos()
-                    vector = calculate_vector(start_left_click, end_left_click)
-                    player.jump(vector)
-                    dragging = False
-
-        # Increment the score only when the game is not over
-        # And the player made a successful jump.
-        if not game_over:
-            game_over = player.update()  # Player movement takes place here.
-
-            # Check for collisions after sprite is updated each frame.
-            # Collisions is within the Player class, because the player touches everything.
-            score = player.check_collision(platforms, items, touched_platforms, score)
-
-        if highest_platform in touched_platforms:
-            all_sprites, lowest_platform, highest_platform = refresh_screen(
-                all_sprites,
-                player,
-                platforms,
-                items,
-                touched_platforms,
-                highest_platform,
+
+    def __init__(self, game: Any):
+        super().__init__(game)
+
+        # Normally already finished on the start screen; otherwise load everything now.
+        asset_loader.wait()
+
+        # Load background image and sprites.
+        # Scaled to the configured screen size; decoded and scaled once per process.
+        self.background_image = asset_cache.image("background.png", (settings.screen_width, settings.screen_height), alpha=False)
+        self.player = Player()  # Create the player sprite.
+
+        # Restart the music. The file is only loaded on the first play.
+        sound_bank.play_music("testmusic.mp3", settings.bg_volume)
+
+        # Every layout of this game comes from one seeded generator, so the game can be replayed.
+        self.seed = settings.seed if settings.seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.recorder = None
+
+        self.world = None
+        if settings.infinite_scroll:
+            # One streamed tower: no screen refreshes, so there is no highest platform to reach.
+            self.world = ChunkedWorld(self.rng)
+            self.platforms, self.items = self.world.platforms, self.world.items
+            lowest_platform, self.highest_platform = self.world.start_platform, None
+        else:
+            # Manually choose number of platforms here...
+            self.platforms, self.items, lowest_platform, self.highest_platform = generate_platforms(
+                settings.num_platforms, self.rng
             )
-            sleep(Constants._screen_change())
+            # Replays run on simulation.step(), which only knows the screen-by-screen mode.
+            self.recorder = JumpRecorder(self.seed, overridden())
+
+        self.player.rect.center = (
+            lowest_platform.rect.centerx,
+            lowest_platform.rect.top - settings.player_height // 2,
+        )
+        self.player.previous_rect.update(self.player.rect)
+
+        # Move all sprites into one sprite.group for use in the main game loop.
+        self.all_sprites = pygame.sprite.Group()
+        self.all_sprites.add(self.player)
+        self.all_sprites.add(self.platforms)
+        self.all_sprites.add(self.items)
+
+        # Dirty-rectangle mode composes the background and platforms once per screen.
+        # Scrolling moves everything on screen, so the streamed world is always fully redrawn.
+        self.renderer = None
+        if settings.dirty_rendering and not self.world:
+            self.renderer = DirtyRenderer(screens.screen)
+            self.renderer.rebuild(self.background_image, self.platforms, self.items)
+
+        # Initialize starting values.
+        self.dragging = False
+        self.start_left_click = (0, 0)  # Tuple for the starting mouse position on screen.
+        self.preview = TrajectoryPreview() if settings.preview else None
+        self.aim_position = None    # Latest mouse position while dragging; the preview follows it once per frame.
+        self.score = 0
+        self.touched_platforms = set()  # To be used in updating the score.
+
+        # Prevent the score from incrementing when jumping on the starting platform:
+        lowest_platform.was_touched = True
+        self.touched_platforms.add(lowest_platform)
+
+        # Physics runs at a fixed rate, independent of the render rate. Frame time
+        # is banked in an accumulator and spent in whole physics steps.
+        self.step_time = settings.step_time
+        self.accumulator = 0.0
+        self.ticks = 0  # Physics steps so far; jumps are recorded against it.
+
+    def enter(self) -> None:
+        # Time spent in other states (the screen transition) is not game time.
+        self.accumulator = 0.0
+        self.dragging = False
+        self.aim_position = None
+        if self.preview:
+            self.preview.clear()
+
+    def handle_event(self, event: Any) -> None:
+        if event.type == pygame.MOUSEBUTTONDOWN:  # Left click.
+
+            # If player isn't jumping, allow click.
+            if not self.player.is_jumping:
+                self.dragging = True
+                self.start_left_click = event.pos
+
+        elif event.type == pygame.MOUSEMOTION:  # Aiming.
+
+            if self.dragging:
+                self.aim_position = event.pos
+
+        elif event.type == pygame.MOUSEBUTTONUP:  # Release left click.
+
+            if self.dragging:
+                self.aim_position = None
+                if self.preview:
+                    self.preview.clear()
+                end_left_click = event.pos
+                vector = calculate_vector(self.start_left_click, end_left_click)
+                self.player.jump(vector)
+                if self.recorder:
+                    self.recorder.record(self.ticks, self.start_left_click, end_left_click)
+                self.dragging = False
+
+    def update(self, dt: float) -> None:
+        # Cap the banked time so a long stall cannot cause a burst of catch-up steps.
+        self.accumulator += min(dt, settings.max_frame_time)
+
+        while self.accumulator >= self.step_time:
+            self.accumulator -= self.step_time
+
+            # One physics step, in the same order as the headless simulation.step().
+            floor = self.world.floor() if self.world else None
+            result = advance(self, floor)
 
-        # Background image setter.
-        screen.blit(background_image, (0, 0))
+            if result == GAME_OVER:
+                if self.recorder:
+                    self.recorder.save_in_background(settings.recording_file, self.score, self.ticks)
 
-        # Drawing updated character position for each frame.
-        # Would apply to platforms if they were also moving.
-        all_sprites.draw(screen)
-        always_display_score(score)
+                # If Game Over is reached, show the results and give the player the option to restart.
+                run = {"seed": self.seed, "ticks": self.ticks}
+                self.game.change(GameOverState(self.game, self.score, run))
+                return
 
-        pygame.display.flip()
-        clock.tick(Constants._fps())
-        # End while-loop.
+            if self.world:
+                start = profiler.start()
+                self.world.scroll(self.player, self.touched_platforms)
+                profiler.stop("refresh", start)
 
-    # If Game Over is reached, execute this function to display
-    # results and give the player the option to restart.
-    game_over_screen(score)
+            elif result == NEXT_SCREEN:
+                start = profiler.start()
+                self.all_sprites, _, self.highest_platform = refresh_screen(
+                    self.all_sprites,
+                    self.player,
+                    self.platforms,
+                    self.items,
+                    self.touched_platforms,
+                    self.highest_platform,
+                    self.rng,
+                )
+                if self.renderer:
+                    self.renderer.rebuild(self.background_image, self.platforms, self.items)
+                profiler.stop("refresh", start)
 
+                # Pause on the new screen, then come back to this same game.
+                self.game.change(TransitionState(self.game, self), dispose=False)
+                return
 
-def game_over_screen(score: int) -> None:
+    def collect(self, item: Any) -> None:
+        """
+        Called by advance() for each item the player picks up.
+        """
+        if self.world:
+            self.world.collect(item)
+        self.player.collect(item)
+
+    def draw(self) -> None:
+        # Draw the player between its last two physics positions.
+        player_rect = self.player.draw_rect(self.accumulator / self.step_time)
+
+        if self.preview and self.aim_position is not None:
+            # Recomputed only when the mouse has moved since the last frame.
+            floor = self.world.floor() if self.world else None
+            self.preview.aim(self.player.rect, self.start_left_click, self.aim_position, self.platforms, floor)
+
+        if self.renderer:
+            # Only the regions that changed since the last frame are pushed.
+            self.renderer.draw(self.player, self.items, self.score, player_rect, self.preview)
+        elif self.world:
+            screens.screen.blit(self.background_image, (0, 0))
+            self.world.draw(screens.screen, self.player, player_rect)
+            if self.preview:
+                self.preview.draw(screens.screen, -self.world.camera_y)
+            always_display_score(self.score)
+
+            start = profiler.start()
+            pygame.display.flip()
+            profiler.stop("flip", start)
+        else:
+            # Background image setter.
+            screens.screen.blit(self.background_image, (0, 0))
+
+            # Drawing updated platform and character positions for each frame.
+            self.platforms.draw(screens.screen)
+            self.items.draw(screens.screen)
+            screens.screen.blit(self.player.image, player_rect)
+            if self.preview:
+                self.preview.draw(screens.screen)
+            always_display_score(self.score)
+
+            start = profiler.start()
+            pygame.display.flip()
+            profiler.stop("flip", start)
+
+    def invalidate(self) -> None:
+        if self.renderer:
+            self.renderer.invalidate()
+
+    def dispose(self) -> None:
+        # Platforms and items go back to their pools; kill() removes the player from all groups.
+        for platform in self.platforms.sprites():
+            platform_pool.release(platform)
+
+        for item in self.items.sprites():
+            item_pool.release(item)
+
+        for sprite in self.all_sprites.sprites():
+            sprite.kill()
+
+        self.touched_platforms.clear()
+        self.player = self.world = self.renderer = None
+        self.all_sprites = self.platforms = self.items = self.highest_platform = None
+
+
+class TransitionState(GameState):
+    """
+    Short pause on a freshly generated screen before play resumes.
+    Events are still handled, so the window stays responsive.
+    """
+
+    def __init__(self, game: Any, playing: PlayingState):
+        super().__init__(game)
+        self.playing = playing
+        self.remaining = settings.transition_time
+
+    def update(self, dt: float) -> None:
+        self.remaining -= dt
+        if self.remaining <= 0:
+            self.game.change(self.playing)
+            self.playing = None
+
+    def draw(self) -> None:
+        if self.playing:
+            self.playing.draw()
+
+    def invalidate(self) -> None:
+        if self.playing:
+            self.playing.invalidate()
+
+    def dispose(self) -> None:
+        # Leaving mid-pause (quitting) still releases the game being paused.
+        if self.playing:
+            self.playing.dispose()
+            self.playing = None
+
+
+class GameOverState(GameState):
     """
     Display the 'Game Over' screen and trigger restart or quit.
     """
-    # Save player score to a CSV.
-    highscore = save_score(score)
-    button_rect = pygame.Rect(
-        Constants._screen_w() // 2 - Constants._display_offset(),
-        Constants._screen_h() // 2 + Constants._button_h(),
-        Constants._button_w(),
-        Constants._button_h()
-    )
-
-    while True:
-        screen.fill(Constants._black())  # Overwrite the screen with a black background.
-
-        # display_text(str, color, x_pos, y_pos)
-        display_text(
-            "Game Over",
-            Constants._red(),
-            (Constants._screen_w() // 2 - Constants._display_offset()),
-            (Constants._screen_h() // 2 - Constants._display_offset())
-        )
-        display_text(
-            f"Score: {score}",
-            Constants._white(),
-            (Constants._screen_w() // 2 - Constants._display_offset()),
-            (Constants._screen_h() // 2 - Constants._display_offset() / 2)
-        )
-        display_text(
-            f"High Score: {highscore}",
-            Constants._aqua(),
-            (Constants._screen_w() // 2 - Constants._display_offset()),
-            (Constants._screen_h() // 2)
-        )
 
-        # Impliment restart button tie-in.
-        pygame.draw.rect(screen, Constants._button_color(), button_rect)
-        display_text(
-            "Restart", 
-            Constants._white(), 
-            button_rect.x + Constants._restart_text_dx(), 
-            button_rect.y + Constants._text_dy()
-        )
-        pygame.display.flip()
+    def __init__(self, game: Any, score: int, run: dict = None):
+        super().__init__(game)
+
+        # Save player score to a CSV. The file is written in the background.
+        self.score = score
+        self.highscore = save_score(score, run)
+        self.button_rect, self.upper_layout, self.lower_layout = game_over_layout(self.score, self.highscore)
+
+    def handle_event(self, event: Any) -> None:
+        if event.type == pygame.MOUSEBUTTONDOWN and self.button_rect.collidepoint(event.pos):
+            self.game.change(PlayingState(self.game))  # Play the game from the beginning.
 
-        # Since we are out of the game loop, we need to account for
-        # whenever we quit the game (exiting the window).
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:  # Quit = Red x on the top right of the window.
-                pygame.quit()
-                exit()
+    def invalidate(self) -> None:
+        # The text was rendered for the old window size; lay it out again with the new fonts.
+        self.button_rect, self.upper_layout, self.lower_layout = game_over_layout(self.score, self.highscore)
 
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if button_rect.collidepoint(event.pos):
-                    restart()  # Play the game loop from the beginning.
+    def draw(self) -> None:
+        draw_menu(self.button_rect, self.upper_layout, self.lower_layout)
 
 
-def restart() -> None:
+class Game:
     """
-    Restart the game by re-entering the game loop.
+    Owns the active state and runs the single game loop. With a bot, its
+    events are handled along with the real ones.
     """
-    play()
+
+    def __init__(self, bot: AutoPlayer = None):
+        self.bot = bot
+        self.state = None
+        self.running = True
+        self._next_state = None
+        self._dispose_current = True
+
+    def change(self, state: GameState, dispose: bool = True) -> None:
+        """
+        Switch to state at the end of the current frame. The current state is
+        disposed of unless dispose is False (it will be resumed later).
+        """
+        self._next_state = state
+        self._dispose_current = dispose
+
+    def run_frame(self, dt: float, events: list) -> None:
+        """
+        Advance the active state by one frame of dt seconds.
+        """
+        profiler.begin_frame()
+
+        start = profiler.start()
+        for event in events:
+            if event.type == pygame.QUIT:  # Quit = Red x on the top right of the window
+                self.running = False
+                return
+
+            if event.type == pygame.VIDEORESIZE:
+                # Only the drawing changes size; the game keeps its logical coordinates.
+                resize_display()
+                self.state.invalidate()
+                continue
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                # F3 shows or hides the frame profiler overlay.
+                profiler.toggle_overlay()
+                self.state.invalidate()
+                continue
+
+            self.state.handle_event(event)
+        profiler.stop("events", start)
+
+        self.state.update(dt)
+
+        start = profiler.start()
+        self.state.draw()
+        profiler.draw_overlay(screens.window)
+        profiler.stop("draw", start)
+        profiler.end_frame()
+
+        if self._next_state is not None:
+            if self._dispose_current:
+                self.state.dispose()
+
+            self.state, self._next_state = self._next_state, None
+            self.state.enter()
+
+    def run(self, state: GameState) -> None:
+        """
+        Run the loop from state until the window is closed.
+        """
+        self.state = state
+        state.enter()
+        screens.clock.tick()
+
+        while self.running:
+            if self.bot:
+                # Uncapped, and every frame is one physics step of game time however long it took.
+                screens.clock.tick()
+                events = viewport.events(pygame.event.get()) + self.bot.events(self.state)
+                self.run_frame(settings.step_time, events)
+
+                self.bot.report(settings.autoplay_report)
+                if self.bot.finished():
+                    self.running = False
+                continue
+
+            dt = screens.clock.tick(settings.fps) / 1000
+            # Mouse positions arrive in window pixels; the game works in logical ones.
+            self.run_frame(dt, viewport.events(pygame.event.get()))
+
+        if self.bot:
+            self.bot.report()
+        self.state.dispose()
+        score_store.flush()  # Let the last leaderboard write finish.
+        replay.flush()  # ...and the last recording.
+        if profiler.count:
+            profiler.export(settings.profile_export)
+        pygame.quit()
 
 
 if __name__ == "__main__":
-    start_screen()  # Only shown once on boot-up.
-    play()
+    load_config()  # Difficulty, config file, JUMPGAME_* variables and --set overrides, applied once.
+
+    # These were built at import, before the settings were loaded.
+    screens.text_cache.max_entries = settings.text_cache_size
+    profiler.reset()
+
+    init_display()
+    score_store.load()  # Read the leaderboard once, before any game ends.
+
+    # Images, sound effects and music are decoded in the background while the start screen shows.
+    sound_bank.init()
+    asset_loader.start()
+
+    # The bot's own choices (blind jumps) follow the layout seed when one is set.
+    bot = AutoPlayer(random.Random(settings.seed), settings.autoplay_seconds) if settings.autoplay else None
+    game = Game(bot)
+    game.run(StartState(game))
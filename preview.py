@@ -0,0 +1,132 @@
+from constants import Constants
+from reachability import Flight, exact, left_after, predict_landing
+from simulation import calculate_vector, fly
+from collections import OrderedDict
+from typing import Any
+
+# Aiming preview shown while the player drags. The path is worked out in
+# closed form by reachability.py (gravity, terminal velocity, rounding and
+# screen wrap), so a new aim costs one landing prediction however long the
+# jump, and nothing is recomputed while the mouse stays still. Each drag
+# (in whole mouse pixels) is solved once per press: moving back over a spot
+# reuses the cached path. Drawing it is at most _PREVIEW_DOTS dots and one
+# outline.
+#
+# A speed of exactly a whole number and a half rounds whichever way the float
+# error in the game goes (see Flight.exact), so those drags are flown step by
+# step with simulation.fly(), the game's own physics, instead.
+
+_CACHE_SIZE = 512   # Drags kept per press.
+
+
+class TrajectoryPreview(Constants):
+    """
+    Dots along the jump the current drag would make, and an outline on the
+    platform it would land on. version changes whenever the picture does.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.points = []        # Player centers along the path, in world coordinates.
+        self.landing = None     # Rect of the predicted landing platform.
+        self.falls = False      # The jump ends in Game Over.
+        self.rects = []         # Screen rects covered by the last draw().
+        self._aim = None        # (start, position) of the current preview.
+        self._cache = OrderedDict()     # Drag (dx, dy) -> (landing, points), least recently used first.
+        self._context = None    # (body, floor, platforms) the cache was built for.
+
+    def aim(self, body: Any, start: tuple, position: tuple, platforms: Any, floor: int = None) -> bool:
+        """
+        Preview the jump from the standing body rect for a drag from start to
+        position. Return False without doing anything if the drag is unchanged.
+        """
+        if (start, position) == self._aim:
+            return False
+        self._aim = (start, position)
+
+        # Only the drag itself matters while the body and platforms stay put.
+        context = (tuple(body), floor, id(platforms), len(platforms))
+        if context != self._context:
+            self._context = context
+            self._cache.clear()
+
+        drag = (position[0] - start[0], position[1] - start[1])
+        cached = self._cache.get(drag)
+        if cached is None:
+            cached = self._solve(body, calculate_vector(start, position), platforms, floor)
+            self._cache[drag] = cached
+            if len(self._cache) > _CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(drag)
+
+        self.landing, self.points = cached
+        self.falls = self.landing is None
+        self.version += 1
+        return True
+
+    def _solve(self, body: Any, vector: tuple, platforms: Any, floor: int = None) -> tuple:
+        """
+        Return (landing rect or None, dot positions) for a jump with vector.
+        """
+        flight = Flight(vector[1])
+        if exact(vector, flight):
+            landing, last = predict_landing(body, vector, platforms, floor, flight)
+            position = [0, body.left]  # Step and left of the previous dot; each dot carries on from it.
+
+            def path(step: int) -> tuple:
+                position[1] = left_after(position[1], vector[0], step - position[0])
+                position[0] = step
+                return position[1], body.bottom + flight.fall(step)
+        else:
+            corners = []
+            landing = fly(body, vector, platforms, floor, corners)
+            last = len(corners) - 1
+            path = corners.__getitem__
+
+        # Player centers every few steps, ending where the jump does; long jumps space them further.
+        spacing = max(self._preview_spacing(), -(-last // self._preview_dots()))
+        half_width = body.width // 2
+        half_height = body.height // 2
+        points = []
+        for step in list(range(spacing, last, spacing)) + [last]:
+            left, bottom = path(step)
+            points.append((left + half_width, bottom - half_height))
+
+        return (landing.rect.copy() if landing is not None else None), points
+
+    def clear(self) -> None:
+        if self._aim is None:
+            return
+        self._aim = None
+        self._cache.clear()
+        self._context = None
+        self.points = []
+        self.landing = None
+        self.version += 1
+
+    def active(self) -> bool:
+        return self._aim is not None
+
+    def draw(self, surface: Any, offset: int = 0) -> list:
+        """
+        Draw the preview on a viewport.Canvas, shifted down by offset (the
+        camera), and return the rects covered.
+        """
+        rects = []
+        if self._aim is None:
+            self.rects = rects
+            return rects
+
+        if self.landing is not None:
+            rects.append(surface.draw_rect(self._light_green(), self.landing.move(0, offset), self._preview_dot()))
+
+        radius = self._preview_dot()
+        last = len(self.points) - 1
+        for number, (x, y) in enumerate(self.points):
+            color = self._red() if self.falls and number == last else self._aqua()
+            rects.append(surface.draw_circle(color, (x, y + offset), radius))
+
+        self.rects = rects
+        return rects
+
@@ -0,0 +1,176 @@
+from constants import Constants
+from array import array
+from time import perf_counter
+from typing import Any
+import json
+import pygame
+
+# Per-phase frame profiler. Call sites bracket a phase with
+#     start = profiler.start()
+#     ...
+#     profiler.stop("update", start)
+# and Game calls begin_frame()/end_frame() once per frame. Phase times are
+# summed over the frame (several physics steps can run in one frame) and
+# stored in a fixed-size ring buffer per phase. While disabled, start() and
+# stop() return immediately and nothing is recorded.
+
+PHASES = ("events", "update", "collision", "refresh", "draw", "flip", "frame")
+
+
+class FrameProfiler(Constants):
+    """
+    Ring buffer of per-phase frame times, with percentile summaries, an
+    overlay and CSV/JSON export. Times are kept in seconds.
+    """
+
+    def __init__(self, size: int = None, enabled: bool = None):
+        self.overlay = False
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._overlay_surface = None
+        self._overlay_font = None
+        self._overlay_width = 0
+        self.reset(size, enabled)
+
+    def reset(self, size: int = None, enabled: bool = None) -> None:
+        """
+        Empty the buffer, re-reading the size and on/off setting unless given.
+        """
+        self.size = size or self._profile_frames()
+        self.enabled = self._profile() if enabled is None else enabled
+        self.samples = {phase: array("d", bytes(8 * self.size)) for phase in PHASES}
+        self.count = 0      # Frames recorded in total; the buffer holds the last self.size.
+        self._frame_start = 0.0
+
+    def start(self) -> float:
+        if not self.enabled:
+            return 0.0
+        return perf_counter()
+
+    def stop(self, phase: str, start: float) -> None:
+        if not self.enabled:
+            return
+        self._current[phase] += perf_counter() - start
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        for phase in PHASES:
+            self._current[phase] = 0.0
+        self._frame_start = perf_counter()
+
+    def end_frame(self) -> None:
+        """
+        Store the frame in the ring buffer. Flip time is measured inside the
+        draw calls, so it is taken out of draw here.
+        """
+        if not self.enabled or not self._frame_start:
+            return
+
+        current = self._current
+        current["frame"] = perf_counter() - self._frame_start
+        current["draw"] = max(0.0, current["draw"] - current["flip"])
+
+        slot = self.count % self.size
+        for phase in PHASES:
+            self.samples[phase][slot] = current[phase]
+        self.count += 1
+        self._frame_start = 0.0
+
+    def recorded(self, phase: str) -> list:
+        """
+        Return the buffered samples of a phase, oldest first.
+        """
+        buffer = self.samples[phase]
+        if self.count <= self.size:
+            return list(buffer[:self.count])
+
+        slot = self.count % self.size
+        return list(buffer[slot:]) + list(buffer[:slot])
+
+    def percentiles(self, phase: str) -> tuple[float, float]:
+        """
+        Return (p50, p99) of a phase over the buffer, in milliseconds.
+        """
+        values = sorted(self.recorded(phase))
+        if not values:
+            return 0.0, 0.0
+
+        last = len(values) - 1
+        return values[int(0.5 * last)] * 1000, values[int(0.99 * last)] * 1000
+
+    def toggle_overlay(self) -> None:
+        """
+        Show or hide the overlay. Showing it turns profiling on.
+        """
+        self.overlay = not self.overlay
+        self._overlay_surface = None
+        if self.overlay:
+            self.enabled = True
+
+    def draw_overlay(self, surface: Any) -> Any:
+        """
+        Draw the p50/p99 table in the top-right corner and push only that area.
+        The table is re-rendered a few times per second, not every frame.
+        Return the rect drawn, or None.
+        """
+        if not self.overlay:
+            return None
+
+        if self._overlay_surface is None or self.count % self._profile_refresh() == 0:
+            self._overlay_surface = self._render_overlay()
+
+        # The top-right corner of the area being drawn in (the game, in a letterboxed window).
+        rect = self._overlay_surface.get_rect(topright=surface.get_clip().topright)
+        surface.blit(self._overlay_surface, rect)
+        pygame.display.update(rect)
+        return rect
+
+    def export(self, path: str) -> None:
+        """
+        Write the buffered samples (milliseconds, oldest first) to path, as JSON
+        when path ends in .json and as CSV otherwise.
+        """
+        columns = {phase: [value * 1000 for value in self.recorded(phase)] for phase in PHASES}
+
+        if path.endswith(".json"):
+            summary = {phase: dict(zip(("p50_ms", "p99_ms"), self.percentiles(phase))) for phase in PHASES}
+            with open(path, "w") as file:
+                json.dump({"frames": self.count, "summary": summary, "samples_ms": columns}, file)
+            return
+
+        with open(path, "w") as file:
+            file.write(",".join(PHASES) + "\n")
+            for row in zip(*columns.values()):
+                file.write(",".join(f"{value:.4f}" for value in row) + "\n")
+
+    def _render_overlay(self) -> Any:
+        if self._overlay_font is None:
+            self._overlay_font = pygame.font.SysFont(None, self._profile_font())
+
+        rows = [("phase", "p50 ms", "p99 ms")]
+        for phase in PHASES:
+            p50, p99 = self.percentiles(phase)
+            rows.append((phase, f"{p50:.2f}", f"{p99:.2f}"))
+
+        # The default font is proportional, so each column is placed separately.
+        cells = [[self._overlay_font.render(text, True, self._white()) for text in row] for row in rows]
+        padding = self._profile_font() // 2
+        widths = [max(row[column].get_width() for row in cells) + padding for column in range(3)]
+        line_height = self._overlay_font.get_linesize()
+
+        # Opaque and never narrower than before, so each blit fully covers the last table.
+        self._overlay_width = max(self._overlay_width, sum(widths) + padding)
+        surface = pygame.Surface((self._overlay_width, line_height * len(cells)))
+        surface.fill(self._black())
+        for number, row in enumerate(cells):
+            x = padding
+            for column, cell in enumerate(row):
+                # Names are left-aligned, numbers right-aligned.
+                offset = 0 if column == 0 else widths[column] - padding - cell.get_width()
+                surface.blit(cell, (x + offset, number * line_height))
+                x += widths[column]
+
+        return surface
+
+
+profiler = FrameProfiler()
@@ -0,0 +1,536 @@
+from constants import Constants
+from config import settings
+from simulation import fly
+from collections import OrderedDict, deque
+from itertools import accumulate, repeat
+from typing import Any
+import bisect
+import math
+import pygame
+
+# Jump reachability between platforms, solved in closed form. Under
+# update_body() a jump's vertical velocity grows by gravity every step up to
+# terminal velocity, and pygame.Rect rounds the position to whole pixels, so
+# the body moves round(velocity) pixels per step. Reading gravity and the
+# launch velocity as fractions (pairs of integers) turns the distance fallen
+# after n steps into a floor sum, which takes O(log n) to evaluate. The
+# horizontal motion is a whole number of pixels per step with a wrap at each
+# side of the screen.
+# Together they answer where a jump lands without flying it step by step.
+#
+#     graph = graph_for(state.platforms)
+#     graph.path(graph.lowest, graph.highest)     # Platform indices, or None.
+#     graph.jumps[i, j]                           # calculate_vector() result.
+
+_ANGLE_SAMPLES = 16         # Launch heights tried per jump, from stepping off to straight up.
+_DENOMINATOR = 10 ** 6      # Largest denominator used to read floats as fractions.
+_GRAPH_CACHE_SIZE = 64      # Layouts whose graphs are kept.
+
+
+def _floor_sum(count: int, divisor: int, step: int, offset: int) -> int:
+    """
+    Return the sum of (step * i + offset) // divisor for i in range(count), in O(log) time.
+    """
+    total = 0
+    while True:
+        if step >= divisor or step < 0:
+            total += count * (count - 1) // 2 * (step // divisor)
+            step %= divisor
+        if offset >= divisor or offset < 0:
+            total += count * (offset // divisor)
+            offset %= divisor
+
+        last = step * count + offset
+        if last < divisor:
+            return total
+
+        # Count the lattice points the other way round (the Euclidean step).
+        count, offset = divmod(last, divisor)
+        divisor, step = step, divisor
+
+
+def _ratio(value: float) -> tuple[int, int]:
+    """
+    Return (numerator, denominator) of the simple fraction a float stands
+    for: 0.1 * 83 is read as 83/10. The same result as
+    Fraction(value).limit_denominator(_DENOMINATOR), in plain integers.
+    """
+    numerator, denominator = value.as_integer_ratio()
+    if denominator <= _DENOMINATOR:
+        return numerator, denominator
+
+    # Continued fraction convergents, as in Fraction.limit_denominator().
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    n, d = numerator, denominator
+    while True:
+        a = n // d
+        q2 = q0 + a * q1
+        if q2 > _DENOMINATOR:
+            break
+        p0, q0, p1, q1 = p1, q1, p0 + a * p1, q2
+        n, d = d, n - a * d
+
+    k = (_DENOMINATOR - q0) // q1
+    p2, q2 = p0 + k * p1, q0 + k * q1
+    # The closer of p1/q1 and p2/q2, preferring p1/q1 on a tie.
+    if abs(p1 * denominator - numerator * q1) * q2 <= abs(p2 * denominator - numerator * q2) * q1:
+        return p1, q1
+    return p2, q2
+
+
+def _physics_ratios() -> tuple:
+    """
+    Return gravity and terminal velocity as _ratio() pairs, read once per settings.
+    """
+    key = (settings.gravity, settings.max_velocity)
+    ratios = _physics_cache.get(key)
+    if ratios is None:
+        ratios = _physics_cache[key] = (_ratio(float(settings.gravity)), _ratio(float(settings.max_velocity)))
+    return ratios
+
+
+_physics_cache = {}
+
+
+class Flight:
+    """
+    Vertical motion of a jump launched with velocity_y, in closed form.
+    Distances are in pixels below the starting position, so they are
+    negative while the body is above it.
+    """
+
+    def __init__(self, velocity_y: float):
+        # Everything in integers: gravity = g / g_d, cap = c / c_d, velocity = v / v_d.
+        (g, g_d), (c, c_d) = _physics_ratios()
+        v, v_d = _ratio(float(velocity_y))
+
+        self.velocity_y = velocity_y
+        self.falling = max(1, -v * g_d // (v_d * g) + 1)   # First step moving down, the only time it can land.
+        self.capped = max(1, -(-(c * v_d - v * c_d) * g_d // (c_d * v_d * g)))  # First step at terminal velocity.
+
+        # Before the cap, step i moves round(velocity + gravity * i) = (gravity * i + offset) // divisor pixels.
+        offset, offset_d = 2 * v + v_d, 2 * v_d    # velocity + 1/2
+        common = math.gcd(offset, offset_d)
+        offset, offset_d = offset // common, offset_d // common
+        self._divisor = math.lcm(g_d, offset_d)
+        self._gravity = g * (self._divisor // g_d)
+        self._offset = offset * (self._divisor // offset_d)
+        self._cap = (2 * c + c_d) // (2 * c_d)    # round(cap)
+        self._before_cap = self._series(self.capped - 1)
+        self._windows = {}
+        self._table = [0]   # fall() of the first steps, once tabulate() has run.
+
+        # A velocity of exactly a whole number and a half rounds, and one of exactly
+        # zero counts as falling, whichever way the float error in the game goes,
+        # so such a flight can be off by a pixel or a step.
+        self.exact = (2 * c + c_d) % (2 * c_d) != 0 and not self._rounds_half() and not self._stops()
+
+    def _rounds_half(self) -> bool:
+        """
+        Return True if the velocity is a whole number and a half on some step
+        before the cap: gravity * i + offset is a multiple of the divisor.
+        Solved as a linear congruence instead of trying every step.
+        """
+        common = math.gcd(self._gravity, self._divisor)
+        if self._offset % common:
+            return False
+        modulus = self._divisor // common
+        first = -self._offset // common * pow(self._gravity // common, -1, modulus) % modulus
+        return (first or modulus) < self.capped
+
+    def _stops(self) -> bool:
+        """
+        Return True if the velocity is exactly zero on some step before the
+        cap: gravity * i + offset is half the divisor.
+        """
+        steps, remainder = divmod(self._divisor - 2 * self._offset, 2 * self._gravity)
+        return remainder == 0 and 1 <= steps < self.capped
+
+    def _series(self, steps: int) -> int:
+        return _floor_sum(steps, self._divisor, self._gravity, self._offset + self._gravity)
+
+    def tabulate(self, steps: int) -> None:
+        """
+        Keep fall() of the first steps steps in a table, one addition per
+        step, so that fall() and crossing() within them are lookups. Worth it
+        when a jump is asked about many times, as predict_landing() does.
+        """
+        table = self._table
+        first = len(table)
+        if steps < first:
+            return
+
+        # The per-step moves before and at the cap, summed in C by accumulate().
+        gravity, offset, divisor = self._gravity, self._offset, self._divisor
+        capped = min(max(first, self.capped), steps + 1)
+        moves = [(gravity * step + offset) // divisor for step in range(first, capped)]
+        moves.extend(repeat(self._cap, steps + 1 - capped))
+        moves[0] += table[-1]
+        table.extend(accumulate(moves))
+
+    def fall(self, steps: int) -> int:
+        """
+        Return how far the body has moved down after steps physics steps.
+        """
+        if steps < len(self._table):
+            return self._table[steps]
+        if steps < self.capped:
+            return self._series(steps)
+        return self._before_cap + (steps - self.capped + 1) * self._cap
+
+    def crossing(self, rise: int) -> int:
+        """
+        Return the first falling step that ends with the body's bottom below a
+        level rise pixels above where it started.
+        """
+        table = self._table
+        if table[-1] > -rise and len(table) > self.falling:
+            # The table never goes back up once falling.
+            return bisect.bisect_right(table, -rise, self.falling)
+
+        # Start from the unrounded path, then move the few steps rounding shifted it.
+        step = max(self.falling, self._estimate(rise))
+        while step > self.falling and self.fall(step - 1) > -rise:
+            step -= 1
+        while self.fall(step) <= -rise:
+            step += 1
+        return step
+
+    def _estimate(self, rise: int) -> int:
+        gravity = settings.gravity
+        velocity = self.velocity_y
+
+        # n * v + g * n * (n + 1) / 2 = -rise; the larger root is on the way down.
+        half = velocity + gravity / 2
+        discriminant = half * half - 2 * gravity * rise
+        if discriminant < 0:
+            return self.falling  # The unrounded path never reaches that level.
+
+        step = math.floor((-half + math.sqrt(discriminant)) / gravity) + 1
+        if step >= self.capped:
+            # Reached at terminal velocity, where the distance grows linearly.
+            step = self.capped - 1 + (-rise - self._before_cap) // self._cap + 1
+        return step
+
+    def window(self, rise: int) -> tuple:
+        """
+        Return (first, last): the steps on which the body can land on a
+        platform rise pixels above where it started, if it overlaps it then.
+        Those are the falling steps that end below the platform top after
+        starting no lower than the collision buffer below it. None if there
+        are none.
+        """
+        window = self._windows.get(rise, False)
+        if window is not False:
+            return window
+
+        buffer = settings.platform_collision_buffer
+        if -self.fall(self.falling - 1) < rise - buffer:
+            window = None  # Still more than the buffer below the top when the fall begins.
+        else:
+            window = (self.crossing(rise), self.crossing(rise - buffer))
+
+        self._windows[rise] = window
+        return window
+
+
+def left_after(left: int, velocity_x: float, steps: int) -> int:
+    """
+    Return the body's rect.left after steps physics steps, including the
+    wrap around the sides of the screen.
+    """
+    velocity_x = math.floor(velocity_x + 0.5)   # What rect.x += velocity_x moves per step.
+    if velocity_x == 0:
+        return left
+
+    width = settings.player_width
+    while True:
+        if velocity_x > 0:
+            # The right edge passes wrap_right on this step...
+            to_wrap = math.floor((settings.wrap_right - width - left) / velocity_x) + 1
+        else:
+            # ...or the left edge passes wrap_left.
+            to_wrap = math.floor((left - settings.wrap_left) / -velocity_x) + 1
+
+        if to_wrap > steps:
+            return left + steps * velocity_x
+
+        if velocity_x > 0:
+            left = _rect_round(settings.wrap_left)
+        else:
+            left = _rect_round(settings.wrap_right) - width
+        steps -= to_wrap
+
+
+def _rect_round(value: float) -> int:
+    """
+    Round the way pygame.Rect does on assignment: halves away from zero.
+    """
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def _first_overlap(left: int, velocity_x: float, rect: Any, first: int, last: int) -> int:
+    """
+    Return the first step from first to last on which the body overlaps rect horizontally, or None.
+    """
+    width = settings.player_width
+    for step in range(first, last + 1):
+        position = left_after(left, velocity_x, step)
+        if position < rect.right and rect.left < position + width:
+            return step
+    return None
+
+
+def exact(vector: tuple, flight: Flight) -> bool:
+    """
+    Return True if the closed form predicts a jump with vector exactly. A
+    horizontal speed of a whole number and a half rounds whichever way the
+    float error in the game goes, like the vertical cases of Flight.exact.
+    """
+    return flight.exact and abs(abs(vector[0]) % 1 - 0.5) > 1e-9
+
+
+def predict_landing(body: Any, vector: tuple, platforms: Any, floor: int = None, flight: Flight = None) -> tuple:
+    """
+    Return (platform, step): where a jump with vector (a calculate_vector()
+    result) from a body standing at the rect body lands, and on which physics
+    step. Return (None, step) if it reaches floor on that step first. flight
+    is the Flight of vector[1], when the caller already has one. Jumps the
+    closed form cannot predict exactly (see exact()) are flown step by step.
+    """
+    if floor is None:
+        floor = settings.screen_height
+    if flight is None:
+        flight = Flight(vector[1])
+
+    if not exact(vector, flight):
+        corners = []
+        landing = fly(pygame.Rect(body), vector, platforms, floor, corners)
+        return landing, len(corners) - 1
+
+    velocity_x = vector[0]
+    bottom = body.bottom
+    game_over = flight.crossing(bottom - floor + 1)     # First step with the bottom at the floor.
+    flight.tabulate(game_over)
+    landing = None
+    landing_step = game_over
+
+    for platform in platforms:
+        rect = platform.rect
+        window = flight.window(bottom - rect.top)
+        if window is None or window[0] > landing_step:
+            continue
+
+        step = _first_overlap(body.left, velocity_x, rect, window[0], min(window[1], landing_step))
+        # The earliest step wins, then the highest platform, then the first listed.
+        if step is not None and (step < landing_step or landing is None or rect.top < landing.rect.top):
+            landing, landing_step = platform, step
+
+    if landing_step >= game_over:
+        return None, game_over
+    return landing, landing_step
+
+
+def _flights() -> list:
+    """
+    Return the Flights solve_jump() tries, lowest first, built once per settings.
+    Launch speeds are whole mouse pixels of drag, and any that would round a
+    half pixel is nudged one pixel faster, so every prediction is exact.
+    """
+    key = (
+        settings.gravity, settings.max_velocity, settings.max_jump_strength,
+        settings.jump_reduction_factor, settings.platform_collision_buffer,
+    )
+    flights = _flight_cache.get(key)
+    if flights is not None:
+        return flights
+
+    strength = settings.max_jump_strength
+    factor = settings.jump_reduction_factor
+    flights = []
+    for sample in range(_ANGLE_SAMPLES + 1):
+        drag = round(strength * factor * sample / _ANGLE_SAMPLES)
+        for pixels in (drag, drag + 1, drag - 1):
+            if 0 <= pixels <= strength * factor:
+                flight = Flight(-pixels / factor)
+                if flight.exact:
+                    flights.append(flight)
+                    break
+
+    _flight_cache.clear()   # Only the current settings are kept.
+    _flight_cache[key] = flights
+    return flights
+
+
+_flight_cache = {}
+
+
+def solve_jump(body: Any, target: Any, platforms: Any = (), floor: int = None) -> tuple:
+    """
+    Return a jump vector that lands a body standing at the rect body on
+    target, or None if there is none. platforms are the other platforms on
+    screen, any of which could catch the jump first. The lowest jump that
+    works is chosen. Both components are whole mouse pixels divided by
+    JUMP_REDUCTION_FACTOR, so jump_drag() turns the answer into an exact drag.
+    """
+    if not any(platform is target for platform in platforms):
+        platforms = [target, *platforms]
+
+    strength = settings.max_jump_strength
+    period = settings.screen_width
+    rise = body.bottom - target.rect.top
+    distance = target.rect.centerx - body.centerx
+    overlap = (body.width + target.rect.width) // 2     # Center distance that still overlaps.
+
+    for flight in _flights():
+        window = flight.window(rise)
+        if window is None:
+            continue
+
+        # A whole number of pixels per step, so x never rounds.
+        velocity_y = flight.velocity_y
+        fastest = math.floor(math.sqrt(max(0.0, strength * strength - velocity_y * velocity_y)) + 1e-9)
+        middle = (window[0] + window[1]) / 2
+
+        # Straight across, or the other way around through the screen wrap.
+        for offset in sorted((distance, distance - period, distance + period), key=abs):
+            if abs(offset) - overlap > fastest * (window[1] + 1):
+                break   # Out of reach this way (a wrap can gain one step), and the rest are further.
+            vector = (float(max(-fastest, min(fastest, round(offset / middle)))), velocity_y)
+            if _first_overlap(body.left, vector[0], target.rect, *window) is None:
+                continue    # Misses the target, whatever else is on screen.
+            if predict_landing(body, vector, platforms, floor, flight)[0] is target:
+                return vector
+
+    return None
+
+
+def jump_drag(vector: tuple, start: tuple = (0, 0)) -> tuple[int, int]:
+    """
+    Return the mouse position to release at, after pressing at start, for
+    calculate_vector() to produce vector.
+    """
+    factor = settings.jump_reduction_factor
+    end = list(start)
+    end[settings.mouse_click_x] = start[settings.mouse_click_x] + round(-vector[0] * factor)
+    end[settings.mouse_click_y] = start[settings.mouse_click_y] + round(-vector[1] * factor)
+    return tuple(end)
+
+
+class _Platform:
+    """
+    Lets plain rects stand in for platforms.
+    """
+
+    def __init__(self, rect: Any):
+        self.rect = rect
+
+
+class ReachabilityGraph(Constants):
+    """
+    Directed graph over the platforms of one layout. An edge i -> j means a
+    player standing in the middle of platform i can land on platform j with
+    one jump, jumps[i, j]. Platforms are numbered in the order given.
+    """
+
+    def __init__(self, rects: list, floor: int = None):
+        self.platforms = [_Platform(pygame.Rect(rect)) for rect in rects]
+        self.edges = [[] for _ in self.platforms]
+        self.jumps = {}
+
+        body = pygame.Rect(0, 0, settings.player_width, settings.player_height)
+        for i, source in enumerate(self.platforms):
+            body.midbottom = source.rect.midtop
+            for j, target in enumerate(self.platforms):
+                if i == j:
+                    continue
+
+                vector = solve_jump(body, target, self.platforms, floor)
+                if vector is not None:
+                    self.edges[i].append(j)
+                    self.jumps[i, j] = vector
+
+        order = sorted(range(len(self.platforms)), key=lambda index: self.platforms[index].rect.top)
+        self.highest = order[0] if order else None
+        self.lowest = order[-1] if order else None
+
+    def reachable(self, start: int) -> set:
+        """
+        Return every platform that can be reached from start, start included.
+        """
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for following in self.edges[queue.popleft()]:
+                if following not in seen:
+                    seen.add(following)
+                    queue.append(following)
+        return seen
+
+    def path(self, start: int, goal: int) -> list:
+        """
+        Return the platforms on a shortest jump sequence from start to goal,
+        both included, or None if goal cannot be reached.
+        """
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = previous[current]
+                return path[::-1]
+
+            for following in self.edges[current]:
+                if following not in previous:
+                    previous[following] = current
+                    queue.append(following)
+
+        return None
+
+    def winnable(self) -> bool:
+        """
+        Return whether the highest platform can be reached from the lowest.
+        """
+        return self.lowest is not None and self.highest in self.reachable(self.lowest)
+
+    def difficulty(self) -> dict:
+        """
+        Return layout difficulty measures: whether it can be cleared, the fewest
+        jumps that clear it and the mean number of platforms each one can reach.
+        """
+        path = self.path(self.lowest, self.highest) if self.platforms else None
+        return {
+            "winnable": path is not None,
+            "min_jumps": len(path) - 1 if path else None,
+            "mean_choices": len(self.jumps) / len(self.platforms) if self.platforms else 0.0,
+        }
+
+
+_graphs = OrderedDict()
+
+
+def graph_for(platforms: Any, floor: int = None) -> ReachabilityGraph:
+    """
+    Return the reachability graph of platforms (anything with a rect, or
+    rects), built once per layout and physics settings and then cached.
+    """
+    rects = tuple(tuple(getattr(platform, "rect", platform)) for platform in platforms)
+    key = (
+        rects, floor,
+        settings.gravity, settings.max_velocity, settings.max_jump_strength, settings.jump_reduction_factor,
+        settings.player_width, settings.player_height, settings.screen_width, settings.screen_height,
+        settings.platform_collision_buffer,
+    )
+
+    graph = _graphs.get(key)
+    if graph is not None:
+        _graphs.move_to_end(key)
+        return graph
+
+    graph = _graphs[key] = ReachabilityGraph(rects, floor)
+    if len(_graphs) > _GRAPH_CACHE_SIZE:
+        _graphs.popitem(last=False)  # Drop the least recently used layout.
+    return graph
@@ -0,0 +1,192 @@
+from constants import Constants
+from screens import always_display_score
+from profiler import profiler
+from viewport import viewport
+from typing import Any
+import pygame
+
+
+class DirtyRenderer(Constants):
+    """
+    Draw the game by redrawing only what changed since the last frame.
+    The background, platforms and items are composed once per screen into a
+    static layer; each frame restores the static layer under the player's old
+    and new rects, collected items and the score box, then pushes only those
+    regions with pygame.display.update(rects). screen is a viewport.Canvas;
+    the static layer is kept at window resolution and recomposed on a resize.
+    """
+
+    def __init__(self, screen: Any):
+        self.screen = screen
+        self.static_layer = screen.layer()
+        self.screen_rect = screen.get_rect()
+        self._viewport_version = viewport.version
+        self._background = None
+        self._platforms = None
+        self._items = []
+        self._player_rect = None
+        self._score = None
+        self._score_rect = None
+        self._preview_version = None
+        self._full_redraw = True
+
+        # Pixels pushed to the display: last frame and running totals.
+        self.pixels_pushed = 0
+        self.total_pixels = 0
+        self.frames = 0
+
+    def rebuild(self, background: Any, platforms: Any, items: Any) -> None:
+        """
+        Compose a new static layer. Call once per screen (start and refresh_screen).
+        """
+        self._background = background
+        self._platforms = platforms
+        self._items = items.sprites()
+        self._compose()
+
+    def _compose(self) -> None:
+        self.static_layer.blit(self._background, (0, 0))
+        self._platforms.draw(self.static_layer)
+        self.static_layer.blits([(item.image, item.rect) for item in self._items], doreturn=False)
+        self._full_redraw = True
+
+    def invalidate(self) -> None:
+        """
+        Push the whole screen on the next draw.
+        """
+        self._full_redraw = True
+
+    def draw(self, player: Any, items: Any, score: int, player_rect: Any = None, preview: Any = None) -> list:
+        """
+        Bring the display up to date and return the rects that were pushed.
+        player_rect overrides where the player is drawn (for interpolation).
+        preview is the aiming TrajectoryPreview, drawn over the player.
+        """
+        if player_rect is None:
+            player_rect = player.rect
+
+        dirty = []
+
+        if self._viewport_version != viewport.version:
+            # The window was resized: a new static layer at the new resolution.
+            self._viewport_version = viewport.version
+            self.static_layer = self.screen.layer()
+            self._compose()
+
+        # Items only disappear between rebuilds, so a length check is enough.
+        if len(items) != len(self._items):
+            dirty.extend(self._remove_collected(items))
+
+        if self._full_redraw:
+            return self._draw_full(player, score, player_rect, preview)
+
+        redraw_player = player_rect != self._player_rect
+        if redraw_player:
+            dirty.append(self._player_rect)
+            dirty.append(player_rect.copy())
+            self._player_rect = player_rect.copy()
+
+        # A changed preview is erased where it was and drawn again in full.
+        preview_changed = preview is not None and preview.version != self._preview_version
+        if preview_changed:
+            dirty.extend(preview.rects)
+            self._preview_version = preview.version
+
+        # A player that has not moved is drawn again only over something restored
+        # under it, and then all of it is restored first: scaled edges are partly
+        # transparent and would darken if drawn over themselves.
+        if not redraw_player and viewport.overlaps(player_rect, dirty):
+            redraw_player = True
+            dirty.append(player_rect.copy())
+
+        # The score is drawn on top of everything, so redraw it whenever it changed or
+        # was covered (a new preview may cover it anywhere).
+        redraw_score = score != self._score or preview_changed or viewport.overlaps(self._score_rect, dirty)
+        if redraw_score:
+            dirty.append(self._score_rect)
+
+        if not dirty:
+            self._count([])
+            return []
+
+        for rect in dirty:
+            self.screen.blit(self.static_layer, rect, rect)
+
+        if redraw_player:
+            self.screen.blit(player.image, player_rect)
+
+        if preview is not None:
+            # An unchanged preview is only pushed where the restored regions covered it.
+            drawn = preview.draw(self.screen)
+            dirty.extend(drawn if preview_changed else [rect for rect in drawn if rect.collidelist(dirty) != -1])
+
+        if redraw_score:
+            self._score = score
+            self._score_rect = always_display_score(score)
+            dirty.append(self._score_rect)
+
+        dirty = [rect.clip(self.screen_rect) for rect in dirty]
+        start = profiler.start()
+        self.screen.update(dirty)
+        profiler.stop("flip", start)
+        self._count(dirty)
+        return dirty
+
+    def stats(self) -> dict:
+        """
+        Return pixels pushed in the last frame and the average per frame.
+        """
+        return {
+            "pixels_last_frame": self.pixels_pushed,
+            "pixels_per_frame": self.total_pixels / self.frames if self.frames else 0,
+            "full_frame": self.screen_rect.width * self.screen_rect.height,
+        }
+
+    def _draw_full(self, player: Any, score: int, player_rect: Any, preview: Any = None) -> list:
+        """
+        Push the whole screen, used for the first frame after a rebuild.
+        """
+        self.screen.blit(self.static_layer, (0, 0))
+        self.screen.blit(player.image, player_rect)
+        self._player_rect = player_rect.copy()
+        if preview is not None:
+            preview.draw(self.screen)
+            self._preview_version = preview.version
+        self._score = score
+        self._score_rect = always_display_score(score)
+        self._full_redraw = False
+
+        start = profiler.start()
+        pygame.display.flip()
+        profiler.stop("flip", start)
+        self._count([self.screen_rect])
+        return [self.screen_rect]
+
+    def _remove_collected(self, items: Any) -> list:
+        """
+        Erase collected items from the static layer and return their rects.
+        """
+        collected = [item for item in self._items if not item.alive()]
+        self._items = items.sprites()
+
+        for item in collected:
+            rect = item.rect
+            self.static_layer.blit(self._background, rect, rect)
+
+            # Repaint anything on the static layer that overlapped the restored pixels
+            # (a pixel or so around the item when scaled), only over those pixels:
+            # scaled sprites have partly transparent edges that must not be drawn twice.
+            restored = viewport.rect(rect)
+            self.static_layer.clip(rect)
+            for sprite in self._platforms.sprites() + self._items:
+                if viewport.rect(sprite.rect).colliderect(restored):
+                    self.static_layer.blit(sprite.image, sprite.rect)
+            self.static_layer.clip()
+
+        return [item.rect for item in collected]
+
+    def _count(self, rects: list) -> None:
+        pixels = sum(rect.width * rect.height for rect in rects)
+        self.pixels_pushed = pixels
+        self.total_pixels += pixels
+        self.frames += 1
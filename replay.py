@@ -0,0 +1,173 @@
+from constants import Constants
+from config import configure, defaults, snapshot
+from simulation import calculate_vector, new_game, step
+from time import perf_counter
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import threading
+
+# Compact binary recordings of a game. A game is fully determined by its
+# layout seed, the settings it ran with and the jumps made, so that is all a
+# recording holds:
+#   header:   magic, format version, seed, final score, total ticks, jump count,
+#             settings length
+#   settings: the settings that differ from the defaults, as UTF-8 JSON
+#   jumps:    (tick, start_left_click, end_left_click), 12 bytes each
+# Ticks count fixed physics steps, so a replay does not depend on frame timing.
+# The game saves its recording on a background thread, through a temporary
+# file, so Game Over never waits on the disk.
+
+_MAGIC = b"JREC"
+_VERSION = 2
+_HEADER = struct.Struct("<4sBQiIII")
+_JUMP = struct.Struct("<Ihhhh")
+
+
+class JumpRecorder:
+    """
+    Collects the jumps of one game and writes them out when the game ends.
+    """
+
+    def __init__(self, seed: int, settings: dict = None):
+        self.seed = seed
+        self.settings = settings or {}  # config.overridden() when the game started.
+        self.jumps = []     # (tick, start_left_click, end_left_click)
+        self.score = 0
+        self.ticks = 0
+        self.last_error = None  # OSError from a background save, if any.
+
+    def record(self, tick: int, start_left_click: tuple, end_left_click: tuple) -> None:
+        self.jumps.append((tick, tuple(start_left_click), tuple(end_left_click)))
+
+    def save(self, path: str, score: int, ticks: int) -> None:
+        """
+        Write the recording with the game's final score and tick count.
+        """
+        self.score = score
+        self.ticks = ticks
+        data = self._encode()
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+    def save_in_background(self, path: str, score: int, ticks: int) -> None:
+        """
+        save() on a daemon thread. An OSError is kept in last_error instead
+        of being raised; flush() waits for every pending save.
+        """
+        def write() -> None:
+            try:
+                self.save(path, score, ticks)
+            except OSError as error:
+                self.last_error = error
+
+        writer = threading.Thread(target=write, name="recording-writer", daemon=True)
+        _writers[:] = [thread for thread in _writers if thread.is_alive()] + [writer]
+        writer.start()
+
+    def _encode(self) -> bytes:
+        # The seed field is 64 bits; config limits SEED to that range.
+        settings = json.dumps(self.settings, sort_keys=True).encode()
+        parts = [_HEADER.pack(_MAGIC, _VERSION, self.seed, self.score, self.ticks, len(self.jumps), len(settings)), settings]
+        parts.extend(_JUMP.pack(tick, *start, *end) for tick, start, end in self.jumps)
+        return b"".join(parts)
+
+    @classmethod
+    def load(cls, path: str) -> "JumpRecorder":
+        with open(path, "rb") as file:
+            data = file.read()
+
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path} is not a version {_VERSION} jump recording.")
+
+        magic, version, seed, score, ticks, count, length = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} jump recording.")
+
+        start = _HEADER.size + length
+        recording = cls(seed, json.loads(data[_HEADER.size:start]))
+        recording.score = score
+        recording.ticks = ticks
+        for tick, start_x, start_y, end_x, end_y in _JUMP.iter_unpack(data[start:start + count * _JUMP.size]):
+            recording.record(tick, (start_x, start_y), (end_x, end_y))
+
+        return recording
+
+
+def flush() -> None:
+    """
+    Block until every background save has finished. Called on exit.
+    """
+    for writer in list(_writers):
+        writer.join()
+
+
+_writers = []   # Background saves, finished ones included until the next save.
+
+
+def replay(recording: JumpRecorder) -> dict:
+    """
+    Play a recording headlessly through simulation.step(), as fast as possible,
+    with the settings it was recorded with. Return the replayed score next to
+    the recorded one.
+    """
+    previous = snapshot()
+    configure({**defaults(), **recording.settings})
+    try:
+        start = perf_counter()
+        state = new_game(random.Random(recording.seed))
+        jumps = iter(recording.jumps)
+        jump = next(jumps, None)
+
+        while not state.game_over and state.ticks < recording.ticks:
+            vector = None
+            if jump is not None and jump[0] == state.ticks:
+                vector = calculate_vector(jump[1], jump[2])
+                jump = next(jumps, None)
+
+            step(state, vector)
+
+        seconds = perf_counter() - start
+        physics_hz = Constants._physics_hz()
+    finally:
+        configure(previous)
+
+    return {
+        "score": state.score,
+        "recorded_score": recording.score,
+        "matches": state.score == recording.score and state.ticks == recording.ticks,
+        "ticks": state.ticks,
+        "seconds": seconds,
+        "speedup": state.ticks / physics_hz / seconds if seconds else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a jump recording headlessly and check its final score.")
+    parser.add_argument("path", nargs="?", default=Constants._recording_file())
+    args = parser.parse_args()
+
+    try:
+        recording = JumpRecorder.load(args.path)
+    except OSError as error:
+        parser.print_usage(sys.stderr)
+        parser.exit(2, f"{parser.prog}: cannot read {args.path}: {error.strerror}\n")
+    except ValueError as error:
+        parser.exit(2, f"{parser.prog}: {error}\n")
+    result = replay(recording)
+    print(
+        f"seed {recording.seed}, {len(recording.jumps)} jumps, {result['ticks']} ticks: "
+        f"score {result['score']} (recorded {result['recorded_score']}), "
+        f"{result['speedup']:.0f}x real time"
+    )
+    raise SystemExit(0 if result["matches"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+from constants import Constants
+from datetime import datetime
+import csv
+import os
+import queue
+import threading
+
+# High scores are kept in memory and written to disk by a background thread,
+# so the game never waits on the file system. Each write goes to a temporary
+# file that replaces the real one with os.replace(), so a crash mid-write
+# leaves the previous leaderboard intact instead of a half-written file.
+
+_FIELDS = ("score", "time", "seed", "ticks")
+
+
+class ScoreStore(Constants):
+    """
+    Top-N leaderboard of finished games with their time and run metadata.
+    """
+
+    def __init__(self, path: str = None, size: int = None):
+        self.path = path    # Both default to the settings in effect at load().
+        self.size = size
+        self.entries = []       # Highest score first.
+        self.loaded = False
+        self.writes = 0
+        self.last_error = None  # Most recent OSError from the writer, if any.
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """
+        Read the leaderboard once. Files from older versions hold a single
+        integer (the high score) and are read as one entry.
+        """
+        self.loaded = True
+        self.path = self.path or self._score_file()
+        self.size = self.size or self._leaderboard_size()
+        try:
+            with open(self.path, newline="") as file:
+                rows = list(csv.reader(file))
+        except FileNotFoundError:
+            return
+
+        entries = []
+        for row in rows:
+            if not row or row[0] == _FIELDS[0]:
+                continue  # Blank line or header.
+
+            try:
+                entry = dict(zip(_FIELDS, row))
+                entry["score"] = int(entry["score"])
+            except ValueError:
+                continue  # Skip anything unreadable rather than losing the rest.
+
+            entries.append(entry)
+
+        self.entries = sorted(entries, key=lambda entry: -entry["score"])[:self.size]
+
+    def high_score(self) -> int:
+        if not self.loaded:
+            self.load()
+        return self.entries[0]["score"] if self.entries else 0
+
+    def submit(self, score: int, run: dict = None) -> int:
+        """
+        Add a finished game and return the high score including it. The write
+        is queued for the background thread; this never touches the disk
+        (except for the first load).
+        """
+        if not self.loaded:
+            self.load()
+
+        entry = {"score": score, "time": datetime.now().isoformat(timespec="seconds")}
+        entry.update(run or {})
+
+        # Stable sort, so an equal score ranks below the older entry.
+        self.entries.append(entry)
+        self.entries.sort(key=lambda entry: -entry["score"])
+        del self.entries[self.size:]
+
+        self._queue.put([dict(entry) for entry in self.entries])
+        self._start_writer()
+        return self.entries[0]["score"]
+
+    def leaderboard(self) -> list[dict]:
+        if not self.loaded:
+            self.load()
+        return [dict(entry) for entry in self.entries]
+
+    def flush(self) -> None:
+        """
+        Block until every queued write has finished. Called on exit.
+        """
+        if self._writer is not None:
+            self._queue.join()
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="score-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            snapshot = self._queue.get()
+            done = 1
+
+            # Only the newest snapshot matters; skip any that piled up behind a slow write.
+            while True:
+                try:
+                    snapshot = self._queue.get_nowait()
+                    done += 1
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(snapshot)
+                self.writes += 1
+            except OSError as error:
+                self.last_error = error     # Kept in memory; the next submit tries again.
+            finally:
+                for _ in range(done):
+                    self._queue.task_done()
+
+    def _write(self, entries: list) -> None:
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", newline="") as file:
+            writer = csv.DictWriter(file, _FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(entries)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, self.path)
+
+
+score_store = ScoreStore()
+
+
+def main() -> None:
+    for rank, entry in enumerate(score_store.leaderboard(), 1):
+        print(f"{rank:>3}. {entry['score']:>6}  {entry.get('time', '')}  seed {entry.get('seed', '-')}")
+
+
+if __name__ == "__main__":
+    main()
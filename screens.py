@@ -1,24 +1,117 @@
 from constants import Constants
-from sys import exit
+from assets import asset_cache
+from profiler import profiler
+from config import settings
+from viewport import Canvas, viewport
+from collections import OrderedDict
+from typing import Any
 import pygame
 
 
-# Initialize Pygame (required to be at top of file).
-pygame.init()
-screen = pygame.display.set_mode((Constants._screen_w(), Constants._screen_h()))
-pygame.display.set_caption("Jump King + Doodle Jump")
-clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, Constants._lg_font())        # Regular font for all text graphics.
-small_font = pygame.font.SysFont(None, Constants._sm_font())  # Starting screen font.
+# Set by init_display(). Importing this module has no side effects, so the
+# game logic can run without a window. Everything draws on screen, a Canvas in
+# logical coordinates; window is the display surface it is scaled onto.
+screen = None
+window = None
+clock = None
+font = None         # Regular font for all text graphics, sized for the window.
+small_font = None   # Starting screen font, sized for the window.
 
 
-def display_text(text: str, color: tuple, x: int, y: int) -> None:
+def init_display() -> Any:
+    """
+    Initialize Pygame, open the window and create the fonts. Return the screen canvas.
+    """
+    global screen, window, clock
+
+    pygame.init()
+    size = (Constants._window_w() or Constants._screen_w(), Constants._window_h() or Constants._screen_h())
+    window = pygame.display.set_mode(size, pygame.RESIZABLE if Constants._resizable() else 0)
+    viewport.fit(window.get_size())
+    screen = Canvas(window, viewport)
+    pygame.display.set_caption("Jump King + Doodle Jump")
+    clock = pygame.time.Clock()
+    _load_fonts()
+    return screen
+
+
+def _load_fonts() -> None:
+    """
+    Create the fonts at the window's scale, so text is rasterized at the
+    resolution it is shown at instead of being scaled up as a bitmap.
+    """
+    global font, small_font, _score_surface
+
+    font = pygame.font.SysFont(None, max(1, round(Constants._lg_font() * viewport.scale)))
+    small_font = pygame.font.SysFont(None, max(1, round(Constants._sm_font() * viewport.scale)))
+    text_cache.clear()
+    _score_surface = (None, None)
+
+
+def resize_display() -> None:
+    """
+    Follow the window to its new size (on VIDEORESIZE). The game keeps its
+    logical coordinates; surfaces are scaled again, once, the next time they are drawn.
+    The fonts are made again at the new scale; menus lay out their text again.
+    """
+    global window
+
+    window = pygame.display.get_surface()
+    window.set_clip(None)
+    window.fill(Constants._black())     # The bars around the game are never drawn again.
+    viewport.fit(window.get_size())
+    screen.attach(window)
+    _load_fonts()
+
+
+class TextCache(Constants):
+    """
+    Bounded LRU cache of rendered text surfaces, keyed by (font, text, color, antialias).
+    The surfaces are at window resolution (see Viewport.native()).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text_font: Any, text: str, color: tuple, antialias: bool = True) -> Any:
+        """
+        Return the rendered surface, rasterizing only on a miss.
+        """
+        key = (text_font, text, color, antialias)
+        surface = self._surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = viewport.native(text_font.render(text, antialias, color))
+        self._surfaces[key] = surface
+
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)  # Evict the least recently used entry.
+
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+
+text_cache = TextCache(Constants._text_cache_size())
+_score_surface = (None, None)   # (score, rendered surface) shown by always_display_score().
+
+
+def display_text(text: str, color: tuple, x: int, y: int) -> Any:
     """
     Helper function to set rendering for on-screen text.
-    Input: text, RGB tuple, x, and y coordinate.
+    Input: text, RGB tuple, x, and y coordinate. Returns the area drawn.
     """
-    img = font.render(text, True, color)
-    screen.blit(img, (x, y))
+    img = text_cache.render(font, text, color)
+    return screen.blit(img, (x, y))
 
 
 def display_smaller_text(text: str, color: tuple, x: int, y: int) -> None:
@@ -26,16 +119,32 @@ def display_smaller_text(text: str, color: tuple, x: int, y: int) -> None:
     Helper function to set rendering for start screen text
     Input: text, RGB tuple, x, and y coordinate.
     """
-    img = small_font.render(text, True, color)
+    img = text_cache.render(small_font, text, color)
     screen.blit(img, (x, y))
 
 
-def start_screen() -> None:
+def centered_lines(text: str, color: tuple, top: float) -> list:
     """
-    Display the start screen with a 'Start' button, and some useful information.
+    Lay out multi-line text with the small font, each line centered on screen.
+    Return (surface, position) pairs ready for screen.blits().
     """
+    layout = []
+    for i, line in enumerate(text.split('\n')):
+        img = text_cache.render(small_font, line, color)
+        width, height = viewport.logical_size(img)
+        layout.append((img, (Constants._screen_w() // 2 - width // 2, top + i * height)))
+
+    return layout
+
 
-    player_image = pygame.image.load("player.png").convert_alpha()
+def start_screen_layout() -> tuple[Any, list, list]:
+    """
+    Lay out the start screen with a 'Start' button, and some useful information. Return:
+    button_rect: Any, upper_layout: list, lower_layout: list
+    The layouts are (surface, position) pairs, built once and blitted every frame.
+    """
+
+    player_image = asset_cache.image("player.png")
     player_rect = player_image.get_rect(
         center = (
             Constants._screen_w() // 2,
@@ -43,13 +152,7 @@ def start_screen() -> None:
             )
         )
 
-    start_button_color = Constants._button_color()
-    button_rect = pygame.Rect(
-        Constants._screen_w() // 2 - Constants._display_offset(), 
-        Constants._screen_h() // 2, 
-        Constants._button_w(), 
-        Constants._button_h()
-    )
+    button_rect = pygame.Rect(settings.start_button)
 
     credited_text = "Welcome to Jump King x Doodle Jump!\n\nby:\nSean Courtney, Jason Sherwood, and James Doocy\n\nCS3021"
     tutorial_text = ("In this game, get as high as your little body can take you! (there's no princess\n\n"
@@ -59,61 +162,78 @@ def start_screen() -> None:
                      "each new platform reached is +1pt. If your character hits the bottom of the\n\n"
                      "screen, it's GAME OVER!")
 
-    while True:
-        screen.fill(Constants._black())
-
-        # Display credited_text centered above the player sprite.
-        credited_lines = credited_text.split('\n') # Turn the wall of text into a list.
-        for i, line in enumerate(credited_lines):
-            text_width, text_height = small_font.size(line)
-            display_smaller_text(
-                line, 
-                Constants._dark_red(), 
-                Constants._screen_w() // 2 - text_width // 2, 
-                (Constants._line_spacing() / 2) + i * text_height
-            )
+    # Credited text centered above the player sprite.
+    upper_layout = centered_lines(credited_text, Constants._dark_red(), Constants._line_spacing() / 2)
+    upper_layout.append((player_image, player_rect))
+
+    # Button text, then the tutorial text centered under the start button.
+    lower_layout = [(
+        text_cache.render(font, "Start", Constants._white()),
+        (button_rect.x + Constants._start_text_dx(), button_rect.y + Constants._text_dy())
+    )]
+    lower_layout += centered_lines(
+        tutorial_text,
+        Constants._dark_red(),
+        button_rect.y + Constants._line_spacing()
+    )
 
-        screen.blit(player_image, player_rect)
+    return button_rect, upper_layout, lower_layout
 
-        pygame.draw.rect(screen, start_button_color, button_rect)
-        display_text(
-            "Start", 
-            Constants._white(), 
-            button_rect.x + Constants._start_text_dx(), 
-            button_rect.y + Constants._text_dy()
-        )
 
-        # Display tutorial_text centered under the start button.
-        tutorial_lines = tutorial_text.split('\n')
-        for i, line in enumerate(tutorial_lines):
-            text_width, text_height = small_font.size(line)
-            display_smaller_text(
-                line, 
-                Constants._dark_red(), 
-                Constants._screen_w() // 2 - text_width // 2, 
-                button_rect.y + Constants._line_spacing() + i * text_height
-            )
+def game_over_layout(score: int, highscore: int) -> tuple[Any, list, list]:
+    """
+    Lay out the 'Game Over' screen with a 'Restart' button. Return:
+    button_rect: Any, upper_layout: list, lower_layout: list
+    """
+    button_rect = pygame.Rect(settings.restart_button)
+
+    text_x = Constants._screen_w() // 2 - Constants._display_offset()
+    text_y = Constants._screen_h() // 2
+    results_layout = [
+        (text_cache.render(font, "Game Over", Constants._red()), (text_x, text_y - Constants._display_offset())),
+        (text_cache.render(font, f"Score: {score}", Constants._white()), (text_x, text_y - Constants._display_offset() / 2)),
+        (text_cache.render(font, f"High Score: {highscore}", Constants._aqua()), (text_x, text_y)),
+    ]
+    restart_layout = [(
+        text_cache.render(font, "Restart", Constants._white()),
+        (button_rect.x + Constants._restart_text_dx(), button_rect.y + Constants._text_dy())
+    )]
+
+    return button_rect, results_layout, restart_layout
 
-        pygame.display.flip()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
+def draw_menu(button_rect: Any, upper_layout: list, lower_layout: list, progress: float = 1.0) -> None:
+    """
+    Draw a menu page: the upper layout, the button, then the lower layout on top of it.
+    While progress is below 1.0 the button is an outline, filled up to progress.
+    """
+    screen.fill(Constants._black())  # Overwrite the screen with a black background.
+    screen.blits(upper_layout, doreturn=False)
+
+    if progress < 1.0:
+        filled = button_rect.copy()
+        filled.width = int(button_rect.width * progress)
+        screen.draw_rect(Constants._button_color(), filled)
+        screen.draw_rect(Constants._button_color(), button_rect, Constants._progress_border())
+    else:
+        screen.draw_rect(Constants._button_color(), button_rect)
 
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if button_rect.collidepoint(event.pos):
-                    return  # Start the game.
+    screen.blits(lower_layout, doreturn=False)
 
+    start = profiler.start()
+    pygame.display.flip()
+    profiler.stop("flip", start)
 
-def always_display_score(score: int) -> None:
+
+def always_display_score(score: int) -> Any:
     """
-    Display score in the top-left corner of the screen.
+    Display score in the top-left corner of the screen and return the area drawn.
     """
+    global _score_surface
+
+    # Only rasterize the text when the score value changes.
+    if _score_surface[0] != score:
+        _score_surface = (score, viewport.native(font.render(f"Score: {score}", True, Constants._white())))
+
     # The starting pixel here is offset from the top left corner.
-    display_text(
-        f"Score: {score}", 
-        Constants._white(), 
-        Constants._score_display(), 
-        Constants._score_display()
-    )
\ No newline at end of file
+    return screen.blit(_score_surface[1], (Constants._score_display(), Constants._score_display()))
\ No newline at end of file
@@ -0,0 +1,660 @@
+from config import settings
+from assets import asset_cache
+from profiler import profiler
+import random
+from typing import Any
+import bisect
+import math
+import pygame
+
+# Headless game logic: player physics, collision, scoring and platform layout.
+# Only pygame.Rect and the collision masks of the images are used here, so
+# nothing in this module needs a display, fonts or a mixer. The sprites in
+# sprites.py and the window in main.py are a thin layer over these functions:
+# both step() and PlayingState.update() run each physics step through
+# advance(), and both change screens through restart_screen().
+
+GAME_OVER = "game_over"         # advance() results.
+NEXT_SCREEN = "next_screen"
+
+
+class Body:
+    """
+    Headless stand-in for the Player sprite: a rect plus velocity state.
+    """
+
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, settings.player_width, settings.player_height)
+        self.previous_rect = self.rect.copy()   # Position before the last update_body().
+        self.velocity_y = 0
+        self.velocity_x = 0
+        self.is_jumping = False
+
+
+class Block:
+    """
+    Headless stand-in for Platform and Items sprites.
+    """
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.was_touched = False
+
+
+class SimState:
+    """
+    Everything needed to advance one game: the player body, the blocks on
+    screen, the score and the tick counter.
+    """
+
+    def __init__(self, rng: Any = None):
+        self.rng = rng if rng is not None else random  # Layout generator; seeded for reproducible games.
+        self.player = Body()
+        self.platforms = []
+        self.items = []
+        self.touched_platforms = set()
+        self.highest_platform = None
+        self.score = 0
+        self.game_over = False
+        self.ticks = 0
+        self.screens = 0    # Number of screen refreshes so far.
+
+    def collect(self, item: Block) -> None:
+        """
+        Remove a picked-up item. Called by advance().
+        """
+        self.items.remove(item)
+
+
+def calculate_vector(start_left_click: tuple, end_left_click: tuple) -> tuple[float, float]:
+    """
+    Return a tuple where each vector element carries a magnitude and radian position.
+    """
+
+    dx = end_left_click[settings.mouse_click_x] - start_left_click[settings.mouse_click_x]
+    dy = end_left_click[settings.mouse_click_y] - start_left_click[settings.mouse_click_y]
+    distance = math.sqrt(dx * dx + dy * dy)
+
+    # Scale the jump strength.
+    strength = min(distance / settings.jump_reduction_factor, settings.max_jump_strength)
+    angle = math.atan2(dy, dx)
+
+    # Invert x-axis for leftward jump.
+    vector_x = -strength * math.cos(angle)
+
+    # Invert y-axis for upward jump.
+    vector_y = -strength * math.sin(angle)
+
+    return (vector_x, vector_y)
+
+
+def update_body(body: Any, floor: int = None) -> bool:
+    """
+    Advance a player body by one physics step. Return True when the body hits
+    the bottom of the screen (Game Over). floor overrides the y of the bottom
+    of the screen, for worlds with a scrolling camera.
+    """
+    if floor is None:
+        floor = settings.screen_height
+
+    # Remembered for swept collision and for interpolated drawing.
+    body.previous_rect.update(body.rect)
+
+    if body.is_jumping:
+        body.velocity_y = move_rect(body.rect, body.velocity_x, body.velocity_y)
+
+        if body.rect.bottom >= floor:
+            # Game Over is set.
+            return True
+
+    wrap_rect(body.rect)
+
+    # All previous checks did not change the state of play.
+    return False
+
+
+def move_rect(rect: Any, velocity_x: float, velocity_y: float) -> float:
+    """
+    Move a jumping rect by one physics step and return its new vertical
+    velocity. pygame.Rect rounds the position to whole pixels. Every jump is
+    flown through here: update_body(), fly() and the layout generator.
+    """
+    # Terminal velocity. Swept collision means this is no longer
+    # needed to stop the player falling through platforms.
+    velocity_y = min(velocity_y + settings.gravity, settings.max_velocity)
+
+    rect.y += velocity_y
+    rect.x += velocity_x
+    return velocity_y
+
+
+def wrap_rect(rect: Any) -> None:
+    """
+    Wrap a player rect around the sides of the screen.
+    """
+    if rect.right > settings.wrap_right:
+        # If half the player sprite is off the right side of the screen...
+        rect.left = settings.wrap_left
+        # then move the player to the left side of the screen, but half-off.
+
+    elif rect.left < settings.wrap_left:
+        # If half the player sprite is off the left side of the screen...
+        rect.right = settings.wrap_right
+        # then move the player to the right side of the screen, but half-off.
+
+
+def crossed_top(previous_bottom: int, rect: Any, platform_rect: Any) -> bool:
+    """
+    Return True if a falling rect, whose bottom was at previous_bottom before
+    this step, lands on platform_rect: the rects overlap horizontally and the
+    bottom started no lower than the collision buffer below the platform top
+    and ended past it.
+    """
+    return (
+        rect.left < platform_rect.right and platform_rect.left < rect.right
+        and previous_bottom <= platform_rect.top + settings.platform_collision_buffer
+        and rect.bottom > platform_rect.top
+    )
+
+
+def swept_rect(body: Any) -> Any:
+    """
+    Return the area covered by the body's bottom edge path during the last step:
+    the current columns, from the previous top down to the current bottom.
+    """
+    top = min(body.previous_rect.top, body.rect.top)
+    bottom = max(body.previous_rect.bottom, body.rect.bottom)
+    return pygame.Rect(body.rect.x, top, body.rect.width, bottom - top)
+
+
+def overlapping(rect: Any, objects: Any) -> list:
+    """
+    Return the objects whose rect overlaps rect, in container order. Containers
+    with a spatial index (spatial_index.SpatialGroup) only check nearby cells.
+    """
+    query = getattr(objects, "query", None)
+    if query is not None:
+        return query(rect)
+
+    return [obj for obj in objects if rect.colliderect(obj.rect)]
+
+
+def item_hits(body: Any, items: Any) -> list:
+    """
+    Return the items the body is touching, in container order. The rects are
+    the broadphase; only items whose rect overlaps are then checked pixel by
+    pixel with the cached masks of player.png and strawberry.png, so the
+    transparent corners of the images do not count (see _PIXEL_COLLISION).
+    """
+    hits = overlapping(body.rect, items)
+    if not hits or not settings.pixel_collision:
+        return hits
+
+    rect = body.rect
+    mask = asset_cache.mask("player.png", rect.size)
+    return [
+        item for item in hits
+        if mask.overlap(asset_cache.mask("strawberry.png", item.rect.size), (item.rect.x - rect.x, item.rect.y - rect.y))
+    ]
+
+
+def platform_hits(body: Any, platforms: Any) -> list:
+    """
+    Return the platforms touched by the body's swept rect, in platform order.
+    """
+    return overlapping(swept_rect(body), platforms)
+
+
+def land_on_platforms(body: Any, hits: list, touched_platforms: set, score: int) -> int:
+    """
+    Resolve the platforms a body overlapped during this step. Landing only
+    happens while falling, and each newly touched platform scores once.
+    The test is swept (continuous): the body's bottom edge must have started
+    the step no lower than the collision buffer below a platform top and ended
+    past it, so no falling speed can tunnel through a platform.
+    """
+    # In short: "falling" = (+)velocity_y, which means "jumping" = (-)velocity_y.
+    if body.velocity_y <= 0:
+        return score
+
+    previous_bottom = body.previous_rect.bottom
+    landing = None
+
+    for platform in hits:
+        # The bottom of the player crossed the top of the platform; the first one crossed wins.
+        if crossed_top(previous_bottom, body.rect, platform.rect):
+            if landing is None or platform.rect.top < landing.rect.top:
+                landing = platform
+
+    if landing is None:
+        return score
+
+    # Assigning player bottom to the top of a platform represented by rect.top.
+    # This only works because the only thing the player can land on is a platform.
+    body.rect.bottom = landing.rect.top
+    body.velocity_y = 0
+    body.is_jumping = False
+
+    if landing not in touched_platforms:
+        # The score-variable will only increment when
+        # the player touches a new platform on screen.
+        touched_platforms.add(landing)
+        score += settings.platform_score
+
+    return score
+
+
+def fly(rect: Any, vector: tuple, platforms: Any, floor: int = None, corners: list = None) -> Any:
+    """
+    Play out a jump with vector (a calculate_vector() result) from a player
+    standing at rect, with the steps of update_body() and land_on_platforms().
+    Return the platform it lands on, or None if it reaches floor first.
+    corners, when given, gets the (left, bottom) of the player after each
+    step, starting with step 0. Platforms are sorted by top, so each step
+    only checks the ones whose top it crossed.
+    """
+    if floor is None:
+        floor = settings.screen_height
+    buffer = settings.platform_collision_buffer
+
+    ordered = sorted(platforms, key=lambda platform: platform.rect.top)
+    tops = [platform.rect.top for platform in ordered]
+
+    rect = pygame.Rect(rect)
+    velocity_x, velocity_y = vector
+    if corners is not None:
+        corners.append((rect.left, rect.bottom))
+
+    while True:
+        previous_bottom = rect.bottom
+        velocity_y = move_rect(rect, velocity_x, velocity_y)
+        if rect.bottom >= floor:
+            if corners is not None:
+                corners.append((rect.left, rect.bottom))
+            return None
+
+        wrap_rect(rect)
+        if corners is not None:
+            corners.append((rect.left, rect.bottom))
+        if velocity_y <= 0:
+            continue
+
+        # Highest first, as in land_on_platforms(); equal tops keep platform order.
+        for index in range(bisect.bisect_left(tops, previous_bottom - buffer), bisect.bisect_left(tops, rect.bottom)):
+            platform = ordered[index]
+            if crossed_top(previous_bottom, rect, platform.rect):
+                if corners is not None:
+                    corners[-1] = (rect.left, platform.rect.top)
+                return platform
+
+
+def resolve_collisions(body: Any, platforms: Any, items: Any, touched_platforms: set, score: int, collect: Any) -> int:
+    """
+    Land the body on the platforms it swept through, then pick up the items
+    it touches, calling collect(item) for each. Return the new score.
+    """
+    hits = platform_hits(body, platforms)
+    score = land_on_platforms(body, hits, touched_platforms, score)
+
+    for item in item_hits(body, items):
+        collect(item)
+        score = collect_item(score)
+
+    return score
+
+
+def advance(state: Any, floor: int = None) -> str:
+    """
+    Run one physics step of a game, in the one order every game uses: move
+    the player, then resolve its collisions, then check for the top platform.
+    state is a SimState or main.PlayingState: anything with player, platforms,
+    items, touched_platforms, highest_platform, score, ticks and collect(item).
+    Return GAME_OVER, NEXT_SCREEN (the caller changes the screen) or None.
+    """
+    state.ticks += 1
+
+    start = profiler.start()
+    game_over = update_body(state.player, floor)
+    profiler.stop("update", start)
+    if game_over:
+        return GAME_OVER
+
+    start = profiler.start()
+    state.score = resolve_collisions(
+        state.player, state.platforms, state.items, state.touched_platforms, state.score, state.collect
+    )
+    profiler.stop("collision", start)
+
+    if state.highest_platform is not None and state.highest_platform in state.touched_platforms:
+        return NEXT_SCREEN
+
+    return None
+
+
+def restart_screen(player: Any, highest_platform: Any, rng: Any) -> tuple[tuple, list, list, int]:
+    """
+    Start the next screen: move the player to the bottom of the screen and
+    lay out platforms above a restart platform under the highest one. Return
+    restart platform position: tuple, platform positions: list, item positions: list, highest platform index: int
+    """
+    # Preserves the player's x-location, changing y.
+    player.rect.bottom = settings.screen_height - settings.platform_height
+    player.previous_rect.update(player.rect)  # Teleported, so nothing to interpolate.
+
+    restart_position = (highest_platform.rect.x, settings.screen_height - settings.platform_height)
+    positions, item_positions, _, highest_index = generate_layout(settings.num_platforms - 1, rng, restart_position)
+    return restart_position, positions, item_positions, highest_index
+
+
+def interpolated_rect(body: Any, alpha: float) -> Any:
+    """
+    Return where to draw the body, alpha of the way from its previous to its
+    current position. Screen wraps and teleports are drawn without blending.
+    """
+    previous = body.previous_rect
+    rect = body.rect
+    dx = rect.x - previous.x
+    dy = rect.y - previous.y
+
+    if abs(dx) > settings.screen_width / 2 or abs(dy) > settings.screen_height / 2:
+        return rect
+
+    return rect.move(-dx * (1 - alpha), -dy * (1 - alpha))
+
+
+def collect_item(score: int) -> int:
+    """
+    Return the score after picking up one item.
+    """
+    # The item score has always been awarded twice per pickup.
+    score += settings.item_score
+    score += settings.item_score
+    return score
+
+
+def _landing_reach() -> list:
+    """
+    Return reach[r]: the largest horizontal distance (between player and
+    platform centers) at which some jump lands on a platform r pixels above
+    the one the player stands on, for r from 0 up to the highest reachable
+    rise. Built by flying a fan of full-strength jumps through the real
+    per-step physics, so rounding is accounted for. Cached per settings.
+    """
+    key = (
+        settings.max_jump_strength, settings.gravity, settings.max_velocity,
+        settings.player_width, settings.platform_width, settings.platform_collision_buffer,
+    )
+    if key in _reach_cache:
+        return _reach_cache[key]
+
+    strength = settings.max_jump_strength
+    reach = []
+    for sample in range(1, _REACH_SAMPLES + 1):
+        # Vertical speed from nearly flat to straight up, always at full strength.
+        velocity_y = -strength * sample / _REACH_SAMPLES
+        velocity_x = math.sqrt(max(0.0, strength * strength - velocity_y * velocity_y))
+
+        # The steps of update_body(), without the floor or screen wrap.
+        # rect.y is minus the height climbed.
+        rect = pygame.Rect(0, 0, 1, 1)
+        while True:
+            previous_height = -rect.y
+            velocity_y = move_rect(rect, velocity_x, velocity_y)
+            height = -rect.y
+            if velocity_y <= 0:
+                continue
+
+            # Falling: every rise in (height, previous_height] is first crossed on this step.
+            for rise in range(max(0, height + 1), previous_height + 1):
+                while len(reach) <= rise:
+                    reach.append(-1)
+                reach[rise] = max(reach[rise], rect.x)
+
+            if height < 0:
+                break
+
+    # A jump reaching a rise can be flattened to land anywhere closer, and the
+    # landing only needs the rects to overlap.
+    overlap = (settings.player_width + settings.platform_width) // 2 - 1
+    reach = [int(distance * _REACH_SAFETY) + overlap if distance >= 0 else -1 for distance in reach]
+    _reach_cache[key] = reach
+    return reach
+
+
+_REACH_SAMPLES = 48     # Jump angles flown to build the reach table.
+_REACH_SAFETY = 0.9     # Fraction of the flown height and distance the generator relies on.
+_reach_cache = {}
+
+
+def generate_layout(
+        num_platforms: int,
+        rng: Any = None,
+        start: tuple = None,
+        height: int = None
+        ) -> tuple[list, list, int, int]:
+    """
+    Place platforms and items and return:
+    platform positions: list, item positions: list, lowest platform index: int, highest platform index: int
+    Positions are (x, y) tuples for the top-left corner, listed from the bottom up.
+
+    Platforms are stratified: the area is cut into num_platforms horizontal
+    bands and each platform is placed in its band, strictly higher than the
+    one before and within jump reach of it (see _landing_reach()), so the
+    player can always climb from the lowest platform to the highest. A
+    spatial hash keeps _PLATFORM_GAP clear pixels around every platform.
+    start is the (x, y) of a platform outside the layout that the chain must
+    begin from (the restart platform); it is kept clear too. A platform that
+    fits nowhere in its band is left out, so an overcrowded area returns
+    fewer than num_platforms platforms, never overlapping ones.
+    height is the height of the area to fill, ending at the bottom of the
+    screen; one screen by default. rng is a random.Random to draw from; the
+    module-level generator is used by default.
+    """
+    if rng is None:
+        rng = random
+
+    # Loop invariants, read once.
+    rand = rng.random
+    platform_w = settings.platform_width
+    platform_h = settings.platform_height
+    gap = settings.platform_gap
+    x_max = settings.platform_x_max
+    bottom = settings.platform_y_max
+    top = settings.platform_top_limit if height is None else bottom - height
+    item_chance = 1 - 1 / settings.even     # Same odds as the old "randint() % even" test.
+    item_dx = settings.item_xoffset
+    item_dy = settings.item_yoffset
+    attempts = settings.generator_attempts
+    reach = _landing_reach()
+    max_rise = int((len(reach) - 1) * _REACH_SAFETY)
+
+    # Spatial hash of placed platforms, bucketed by row. Rows are one platform
+    # plus the gap high, so a platform closer than the gap is always in the
+    # same or a neighbouring row. The layout is one screen wide, so a row
+    # only ever holds a handful of platforms.
+    clear_w = platform_w + gap
+    clear_h = platform_h + gap
+    rows = {}
+    no_platforms = ()
+
+    if start is None:
+        previous_x, previous_y = None, bottom + 1
+    else:
+        previous_x, previous_y = start
+        bottom = min(bottom, previous_y - 1)
+        # The restart platform stays on screen, so nothing may be placed over it either.
+        rows[previous_y // clear_h] = [start]
+
+    band = (bottom - top) / num_platforms if num_platforms else 0
+    platform_positions = []
+    item_positions = []
+
+    for i in range(num_platforms):
+        # Stratified: band i counts up from the bottom. Stay strictly above the
+        # previous platform and no further above it than a jump can reach.
+        low = bottom - (i + 1) * band
+        high = bottom - i * band
+        low = max(low, previous_y - max_rise, top)
+        high = max(min(high, previous_y - 1), low)
+
+        for _ in range(attempts):
+            y = int(low + (high - low) * rand())
+            if previous_x is None:
+                x = int(x_max * rand())
+            else:
+                # Uniform over the part of the screen within reach of the previous platform.
+                spread = reach[previous_y - y]
+                left = previous_x - spread if previous_x > spread else 0
+                right = previous_x + spread if previous_x + spread < x_max else x_max
+                x = int(left + (right - left) * rand())
+
+            row = y // clear_h
+            clear = True
+            for other_row in (row - 1, row, row + 1):
+                for other_x, other_y in rows.get(other_row, no_platforms):
+                    if -clear_w < other_x - x < clear_w and -clear_h < other_y - y < clear_h:
+                        clear = False
+                        break
+            if clear:
+                break
+        else:
+            # Too dense for random draws: search every row of the band for a
+            # clear spot, and leave the platform out if there is none.
+            spot = _clear_spot(rows, math.ceil(low), int(high), previous_x, previous_y, reach, x_max, clear_w, clear_h)
+            if spot is None:
+                continue
+            x, y = spot
+            row = y // clear_h
+
+        if row in rows:
+            rows[row].append((x, y))
+        else:
+            rows[row] = [(x, y)]
+        platform_positions.append((x, y))
+
+        # The player starts on the lowest platform, so it never gets an item.
+        if (i > 0 or start is not None) and rand() < item_chance:
+            item_positions.append((x + item_dx, y - item_dy))
+
+        previous_x, previous_y = x, y
+
+    return platform_positions, item_positions, 0, len(platform_positions) - 1
+
+
+def _clear_spot(
+        rows: dict,
+        low: int,
+        high: int,
+        previous_x: int,
+        previous_y: int,
+        reach: list,
+        x_max: int,
+        clear_w: int,
+        clear_h: int
+        ) -> tuple:
+    """
+    Return the lowest (x, y) with y in low..high that is within reach of the
+    previous platform and clear of every platform in the spatial hash rows,
+    or None. Each row is solved exactly from the x ranges its neighbours block.
+    """
+    for y in range(high, low - 1, -1):
+        if previous_x is None:
+            left, right = 0, x_max
+        else:
+            spread = reach[previous_y - y]
+            left, right = max(0, previous_x - spread), min(x_max, previous_x + spread)
+
+        row = y // clear_h
+        blocked = sorted(
+            (other_x - clear_w + 1, other_x + clear_w - 1)
+            for other_row in (row - 1, row, row + 1)
+            for other_x, other_y in rows.get(other_row, ())
+            if -clear_h < other_y - y < clear_h
+        )
+
+        x = left
+        for start, end in blocked:
+            if start > x:
+                break
+            x = max(x, end + 1)
+        if x <= right:
+            return x, y
+
+    return None
+
+
+def new_game(rng: Any = None) -> SimState:
+    """
+    Return a fresh state with the player standing on the lowest platform.
+    Every layout of the game, including later screens, is drawn from rng.
+    """
+    state = SimState(rng)
+    positions, item_positions, lowest_index, highest_index = generate_layout(settings.num_platforms, state.rng)
+
+    state.platforms = [_platform(x, y) for x, y in positions]
+    state.items = [_item(x, y) for x, y in item_positions]
+    state.highest_platform = state.platforms[highest_index]
+
+    lowest_platform = state.platforms[lowest_index]
+    state.player.rect.center = (
+        lowest_platform.rect.centerx,
+        lowest_platform.rect.top - settings.player_height // 2,
+    )
+    state.player.previous_rect.update(state.player.rect)
+
+    # Prevent the score from incrementing when jumping on the starting platform:
+    lowest_platform.was_touched = True
+    state.touched_platforms.add(lowest_platform)
+    return state
+
+
+def step(state: SimState, jump: tuple = None) -> SimState:
+    """
+    Advance the game by one physics step with advance(), as the windowed game does.
+    Steps do not depend on wall-clock time, so they can run faster than real time.
+    jump is a calculate_vector() result, ignored while the player is airborne.
+    The state is updated in place and returned.
+    """
+    if state.game_over:
+        return state
+
+    player = state.player
+    if jump is not None and not player.is_jumping:
+        player.velocity_x, player.velocity_y = jump
+        player.is_jumping = True
+
+    result = advance(state)
+    if result == GAME_OVER:
+        state.game_over = True
+    elif result == NEXT_SCREEN:
+        next_screen(state)
+
+    return state
+
+
+def next_screen(state: SimState) -> None:
+    """
+    Headless counterpart of refresh_screen(): replace every block with the
+    layout of the next screen from restart_screen().
+    """
+    restart_position, positions, item_positions, highest_index = restart_screen(
+        state.player, state.highest_platform, state.rng
+    )
+    restart_platform = _platform(*restart_position)
+    new_platforms = [_platform(x, y) for x, y in positions]
+
+    state.platforms = [restart_platform] + new_platforms
+    state.items = [_item(x, y) for x, y in item_positions]
+    state.highest_platform = new_platforms[highest_index]
+
+    restart_platform.was_touched = True
+    state.touched_platforms = {restart_platform}
+    state.screens += 1
+
+
+def _platform(x: int, y: int) -> Block:
+    return Block(x, y, settings.platform_width, settings.platform_height)
+
+
+def _item(x: int, y: int) -> Block:
+    return Block(x, y, settings.item_size, settings.item_size)
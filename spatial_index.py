@@ -0,0 +1,92 @@
+from constants import Constants
+from typing import Any
+import pygame
+
+
+class SpatialIndex(Constants):
+    """
+    Uniform grid over objects with a .rect. Each object is stored in every
+    cell its rect touches, so a query only looks at the cells around the
+    query rect instead of every object. Objects are assumed not to move
+    while indexed; remove and re-insert an object to move it.
+    """
+
+    def __init__(self, cell_size: int = None):
+        self.cell_size = cell_size or self._spatial_cell()
+        self._cells = {}
+        self._order = {}    # Insertion number, so query results keep group order.
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def insert(self, obj: Any) -> None:
+        if obj in self._order:
+            return
+
+        self._order[obj] = self._counter
+        self._counter += 1
+        for cell in self._cells_for(obj.rect):
+            self._cells.setdefault(cell, []).append(obj)
+
+    def remove(self, obj: Any) -> None:
+        if self._order.pop(obj, None) is None:
+            return
+
+        for cell in self._cells_for(obj.rect):
+            bucket = self._cells[cell]
+            bucket.remove(obj)
+            if not bucket:
+                del self._cells[cell]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._order.clear()
+
+    def query(self, rect: Any) -> list:
+        """
+        Return the objects whose rect overlaps rect, in insertion order.
+        """
+        found = {}
+        for cell in self._cells_for(rect):
+            for obj in self._cells.get(cell, ()):
+                if obj not in found and rect.colliderect(obj.rect):
+                    found[obj] = self._order[obj]
+
+        if len(found) < 2:
+            return list(found)
+
+        return sorted(found, key=found.__getitem__)
+
+    def _cells_for(self, rect: Any) -> list:
+        size = self.cell_size
+        left = rect.left // size
+        right = (rect.right - 1) // size
+        top = rect.top // size
+        bottom = (rect.bottom - 1) // size
+        return [(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)]
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """
+    Sprite group that keeps a SpatialIndex of its members. The index is updated
+    whenever a sprite is added, removed, killed or the group is emptied.
+    """
+
+    def __init__(self, *sprites: Any):
+        self.index = SpatialIndex()
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite: Any, layer: Any = None) -> None:
+        super().add_internal(sprite)
+        self.index.insert(sprite)
+
+    def remove_internal(self, sprite: Any) -> None:
+        super().remove_internal(sprite)
+        self.index.remove(sprite)
+
+    def query(self, rect: Any) -> list:
+        """
+        Return the sprites whose rect overlaps rect, in group order.
+        """
+        return self.index.query(rect)
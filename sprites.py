@@ -1,4 +1,7 @@
 from constants import Constants
+from assets import asset_cache
+from audio import sound_bank
+from simulation import update_body, resolve_collisions, interpolated_rect
 from typing import Any
 import pygame
 
@@ -15,13 +18,12 @@ class Player(pygame.sprite.Sprite, Constants):
         # Player uses has-a relationship from pygame.
         super().__init__()  # Take attributes from pygame module, inheriting attributes from pygame.
 
-        self.original_image = pygame.image.load("player.png").convert_alpha()
-        self.image = pygame.transform.scale(
-            self.original_image, 
-            (self._player_w(), self._player_h())
-        )
+        # Surfaces come from the shared cache, so the PNG is only decoded once.
+        self.original_image = asset_cache.image("player.png")
+        self.image = asset_cache.image("player.png", (self._player_w(), self._player_h()))
 
         self.rect = self.image.get_rect()  # Forcing player hit box into a square.
+        self.previous_rect = self.rect.copy()  # Position before the last physics step.
 
         self.velocity_y = 0
         self.velocity_x = 0
@@ -35,38 +37,18 @@ class Player(pygame.sprite.Sprite, Constants):
         self.velocity_x, self.velocity_y = vector
         self.is_jumping = True
 
-    def update(self) -> bool:
+    def update(self, floor: int = None) -> bool:
         """
         Update player position on screen based on changing attributes.
+        The physics lives in simulation.update_body().
         """
+        return update_body(self, floor)
 
-        if self.is_jumping:
-
-            self.velocity_y += self._grav()
-            # Too high a velocity will cause the player to fall
-            # through platforms before the collision can be checked.
-            self.velocity_y = min(self.velocity_y, self._max_velocity())
-
-            self.rect.y += self.velocity_y
-            self.rect.x += self.velocity_x
-
-            if self.rect.bottom >= self._screen_h():
-                # Game Over is set.
-                return True
-
-        # Wrap around the screen:
-        if self.rect.right > (self._screen_w() + (self._player_w() / 2)):
-            # If half the player sprite is off the right side of the screen...
-            self.rect.left = 0 - (self._player_w() / 2)
-            # then move the player to the left side of the screen, but half-off.
-
-        elif self.rect.left < (0 - self._player_w() / 2):
-            # If half the player sprite is off the left side of the screen...
-            self.rect.right = self._screen_w() + (self._player_w() / 2)
-            # then move the player to the right side of the screen, but half-off.
-
-        # All previous checks did not change the state of play.
-        return False
+    def draw_rect(self, alpha: float) -> Any:
+        """
+        Return where to draw the player, alpha of the way between physics steps.
+        """
+        return interpolated_rect(self, alpha)
 
     def check_collision(
             self,
@@ -77,47 +59,20 @@ class Player(pygame.sprite.Sprite, Constants):
             ) -> int:
         """
         Check for collision only when falling. To change the platforms structure,
-        change the generate_platforms function in helper_functions.py
+        change the generate_layout function in simulation.py
         """
+        # Landing and pickups are resolved by simulation.resolve_collisions(),
+        # which hands each collected item back to collect().
+        return resolve_collisions(self, platforms, items, touched_platforms, score, self.collect)
 
-        # platform_collision_detection is a list of platforms the player sprite 
-        # has touched each game loop.
-        platform_collision_detection = pygame.sprite.spritecollide(self, platforms, False)
-
-        for platform in platform_collision_detection:
-            # In short: "falling" = (+)velocity_y, which means "jumping" = (-)velocity_y.
-            if self.velocity_y > 0:
-                # Continue with normal collision routine.
-
-                # This code is for the bottom of the player and the top of the platform:
-                if self.rect.bottom <= platform.rect.top + self._platform_collision_buf():
-                    self.rect.bottom = platform.rect.top
-
-                    # Assigning player bottom to the top of a platform represented by rect.top.
-                    # This only works because the only thing the player can land on is a platform.
-                    self.velocity_y = 0
-                    self.is_jumping = False
-
-                if (platform not in touched_platforms) and (self.velocity_y == 0):
-                    # The score-variable will only increment when
-                    # the player touches a new platform on screen.
-                    touched_platforms.add(platform)
-                    score += 1
-
-        # Similarly for items, only remove the item if it's collected.
-        item_collision_detection = pygame.sprite.spritecollide(self, items, False)
-        
-        for item in item_collision_detection:
-            item.kill()
-            score += Constants._item_score()
-
-            # Make a sound collecting the item.
-            item_get = pygame.mixer.Sound("denethor.mp3")
-            item_get.set_volume(self._item_vol())
-            item_get.play()
-            score += Constants._item_score()
+    def collect(self, item: Any) -> None:
+        """
+        Remove a picked-up item and play its sound.
+        """
+        item_pool.release(item)  # Kills the item and keeps it for reuse.
 
-        return score
+        # Make a sound collecting the item (decoded once by loader.default_jobs() on the start screen).
+        sound_bank.play("item_get")
 
 
 class Platform(pygame.sprite.Sprite, Constants):
@@ -128,13 +83,16 @@ class Platform(pygame.sprite.Sprite, Constants):
     def __init__(self, x: int, y: int):
 
         super().__init__()
-        self.original_image = pygame.image.load("platform.png").convert_alpha()
-        self.image = pygame.transform.scale(
-          self.original_image, 
-          (self._platform_w(), self._platform_h())
-        )
+        self.original_image = asset_cache.image("platform.png")
+        self.image = asset_cache.image("platform.png", (self._platform_w(), self._platform_h()))
 
         self.rect = self.image.get_rect()
+        self.reset(x, y)
+
+    def reset(self, x: int, y: int) -> None:
+        """
+        Move the platform to (x, y) as if newly created. Used by SpritePool.
+        """
         self.rect.x = x
         self.rect.y = y
         self.was_touched = False    # Used for collision
@@ -147,14 +105,75 @@ class Items(pygame.sprite.Sprite, Constants):
 
     def __init__(self, x: int, y: int):
         super().__init__()
-        self.original_image = pygame.image.load("strawberry.png").convert_alpha()
-        self.image = pygame.transform.scale(
-            self.original_image, 
-            (self._item_size(), self._item_size())
-        )
+        self.original_image = asset_cache.image("strawberry.png")
+        self.image = asset_cache.image("strawberry.png", (self._item_size(), self._item_size()))
 
         # Creating rectangular object with width = x and height = y.
         self.rect = self.image.get_rect()
+        self.reset(x, y)
+
+    def reset(self, x: int, y: int) -> None:
+        """
+        Move the item to (x, y) as if newly created. Used by SpritePool.
+        """
         self.rect.x = x
         self.rect.y = y
-        self.was_touched = False
\ No newline at end of file
+        self.was_touched = False
+
+
+class SpritePool(Constants):
+    """
+    Recycles Platform or Items instances instead of allocating new ones.
+    release() kills a sprite (removing it from every group) and keeps it;
+    acquire() hands a kept sprite back, reset to its new position.
+    """
+
+    def __init__(self, sprite_class: Any):
+        self.sprite_class = sprite_class
+        self._free = []
+        self.live = 0
+        self.peak_live = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, x: int, y: int) -> Any:
+        if self._free:
+            sprite = self._free.pop()
+            sprite.reset(x, y)
+            self.reused += 1
+        else:
+            sprite = self.sprite_class(x, y)
+            self.created += 1
+
+        sprite.pooled = False
+        self.live += 1
+        self.peak_live = max(self.peak_live, self.live)
+        return sprite
+
+    def release(self, sprite: Any) -> None:
+        # Kill() first, so spatial indexes drop the sprite at its current rect.
+        sprite.kill()
+        if getattr(sprite, "pooled", True):
+            return  # Already released, or never came from a pool.
+
+        sprite.pooled = True
+        self._free.append(sprite)
+        self.live -= 1
+
+    def stats(self) -> dict:
+        """
+        Return the pool size, reuse rate and live object counters.
+        """
+        acquired = self.created + self.reused
+        return {
+            "pool_size": len(self._free),
+            "live": self.live,
+            "peak_live": self.peak_live,
+            "created": self.created,
+            "reuse_rate": self.reused / acquired if acquired else 0.0,
+        }
+
+
+# Shared by every screen, chunk and restart in the process.
+platform_pool = SpritePool(Platform)
+item_pool = SpritePool(Items)
\ No newline at end of file
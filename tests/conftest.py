@@ -0,0 +1,30 @@
+import os
+import sys
+
+# The tests run headless, from the repository root, where the game finds its images.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pytest
+from config import configure, snapshot
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    """
+    Undo any configure() a test makes.
+    """
+    saved = snapshot()
+    yield
+    configure(saved)
+
+
+@pytest.fixture(scope="session")
+def display():
+    import screens
+
+    return screens.init_display()
@@ -0,0 +1,12 @@
+from config import load_config
+import pytest
+
+
+def test_optional_settings_take_the_right_kind_of_number():
+    assert load_config(["--set", "AUTOPLAY_SECONDS=1.5"], {}).autoplay_seconds == 1.5
+    assert load_config([], {"JUMPGAME_AUTOPLAY_SECONDS": "2"}).autoplay_seconds == 2.0
+    assert load_config(["--set", "AUTOPLAY_SECONDS=null"], {}).autoplay_seconds is None
+
+    # Recordings store the seed as a 64-bit integer.
+    with pytest.raises(SystemExit):
+        load_config(["--set", "SEED=1.5"], {})
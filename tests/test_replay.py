@@ -0,0 +1,54 @@
+from config import configure, defaults, load_config, overridden, settings
+from level_evaluator import sample_drag
+from reachability import predict_landing
+from replay import JumpRecorder, replay
+from simulation import calculate_vector, new_game, step
+from typing import Any
+import random
+
+
+def _rank(state: Any, drag: tuple) -> tuple:
+    """
+    Sort key for a drag: safe landings first, then new platforms, then higher ones.
+    """
+    platform = predict_landing(state.player.rect, calculate_vector((0, 0), drag), state.platforms)[0]
+    if platform is None:
+        return False, False, 0
+    return True, platform not in state.touched_platforms, -platform.rect.top
+
+
+def _play(seed: int, recorder: JumpRecorder, max_ticks: int) -> tuple[int, int]:
+    """
+    Play a headless game, jumping to the highest new platform among a few
+    sampled drags, and record the jumps. Return (score, ticks).
+    """
+    state = new_game(random.Random(seed))
+    rng = random.Random(seed + 1)
+
+    while not state.game_over and state.ticks < max_ticks:
+        jump = None
+        if not state.player.is_jumping:
+            end = max((sample_drag(rng) for _ in range(16)), key=lambda drag: _rank(state, drag))
+            recorder.record(state.ticks, (0, 0), end)
+            jump = calculate_vector((0, 0), end)
+        step(state, jump)
+
+    return state.score, state.ticks
+
+
+def test_replay_uses_the_recorded_difficulty(tmp_path):
+    load_config(["--difficulty", "hard"], {})
+    recorder = JumpRecorder(7, overridden())
+    score, ticks = _play(7, recorder, 20 * settings.physics_hz)
+    path = tmp_path / "recording.jrec"
+    recorder.save(str(path), score, ticks)
+
+    # Replay with the defaults in effect, as `python replay.py` would.
+    configure(defaults())
+    recording = JumpRecorder.load(str(path))
+    result = replay(recording)
+
+    assert recording.settings["NUM_PLATFORMS"] == 6
+    assert score > 0
+    assert result["matches"], result
+    assert settings.num_platforms == defaults()["NUM_PLATFORMS"]
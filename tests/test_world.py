@@ -0,0 +1,25 @@
+from world import ChunkedWorld
+from sprites import Player
+from config import settings
+import random
+
+
+def test_evicting_a_chunk_keeps_reused_items_alive(display):
+    world = ChunkedWorld(random.Random(0))
+    player = Player()
+
+    # Collect every item of the first chunk, as PlayingState.collect() does.
+    collected = [sprite for sprite in world.chunks[0] if sprite in world.items]
+    assert collected
+    for item in collected:
+        world.collect(item)
+        player.collect(item)
+
+    # Climb until the first chunk is evicted; newer chunks reuse the collected items.
+    while 0 in world.chunks:
+        player.rect.top -= settings.screen_height // 2
+        world.scroll(player, set())
+
+    assert any(item.alive() for item in collected)
+    assert all(item.alive() for item in world.items)
+    assert sorted(map(id, world.chunk_of)) == sorted(id(sprite) for sprites in world.chunks.values() for sprite in sprites)
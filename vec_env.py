@@ -0,0 +1,306 @@
+from constants import Constants
+from config import configure, snapshot
+from simulation import calculate_vector, new_game, step
+from multiprocessing import shared_memory
+from typing import Any
+import multiprocessing
+import numpy as np
+import random
+
+# Vectorized environment for agent training. Each game instance runs the
+# headless game logic of simulation.py (the rules main.py and sprites.py are
+# a thin layer over) in its own worker process, and every instance is stepped
+# in lockstep: the commands go out to all workers before any reply is read.
+# Commands and replies are a few bytes on a pipe. Observations are never
+# pickled; each worker writes its own row of a shared-memory ring buffer, and
+# step() and reset() return views of the slot just written. A slot is only
+# reused _ENV_RING calls later, so that many recent observations stay valid
+# without copying (frame stacking, or reading one batch while the next runs).
+
+_PLAYER_FIELDS = ("x", "y", "velocity_x", "velocity_y", "is_jumping")
+
+
+def observation_dtype(num_platforms: int, frame_size: tuple = None) -> Any:
+    """
+    Return the NumPy record type of one observation. frame_size is the
+    (width, height) of the downscaled frame, or None for no frame.
+    """
+    fields = [
+        ("player", np.float32, (len(_PLAYER_FIELDS),)),  # _PLAYER_FIELDS; x and y are the top left.
+        ("platforms", np.int32, (num_platforms, 4)),    # (x, y, width, height); unused rows are zero.
+        ("platform_count", np.int32),
+        ("items", np.int32, (num_platforms, 4)),
+        ("item_count", np.int32),
+        ("score", np.int32),
+        ("reward", np.float32),     # Score gained by the last step.
+        ("done", np.bool_),         # Game Over.
+        ("ticks", np.int32),        # Physics steps since the game started.
+        ("screens", np.int32),      # Screens cleared.
+    ]
+    if frame_size is not None:
+        fields.append(("frame", np.uint8, (frame_size[1], frame_size[0], 3)))
+    return np.dtype(fields)
+
+
+class _Instance:
+    """
+    One game played inside a worker, writing its observations into the ring.
+    """
+
+    def __init__(self, seed: int, frame_scale: int = None):
+        self.rng = random.Random(seed)
+        self.state = None
+        self.reward = 0
+        self.frame_scale = frame_scale
+        self.surface = None
+        if frame_scale is not None:
+            import pygame
+            self.surface = pygame.Surface(_frame_size(frame_scale))
+
+    def reset(self) -> None:
+        self.state = new_game(self.rng)
+        self.reward = 0
+
+    def step(self, drag: tuple) -> None:
+        """
+        Jump with the slingshot drag (dx, dy), or just let time pass when it
+        is NaN, then advance _ENV_TICKS physics steps, or until the player
+        stands again when that is None.
+        """
+        state = self.state
+        before = state.score
+        jump = None if np.isnan(drag).any() else calculate_vector((0, 0), (float(drag[0]), float(drag[1])))
+
+        ticks = Constants._env_ticks()
+        step(state, jump)
+        if ticks is None:
+            limit = Constants._env_max_ticks()
+            taken = 1
+            while state.player.is_jumping and not state.game_over and taken < limit:
+                step(state)
+                taken += 1
+        else:
+            for _ in range(ticks - 1):
+                step(state)
+
+        self.reward = state.score - before
+
+    def observe(self, row: Any) -> None:
+        """
+        Write the current observation into row, a record of the shared ring.
+        """
+        state = self.state
+        player = state.player
+        row["player"] = (player.rect.x, player.rect.y, player.velocity_x, player.velocity_y, player.is_jumping)
+
+        _write_rects(row["platforms"], state.platforms)
+        row["platform_count"] = len(state.platforms)
+        _write_rects(row["items"], state.items)
+        row["item_count"] = min(len(state.items), len(row["items"]))
+
+        row["score"] = state.score
+        row["reward"] = self.reward
+        row["done"] = state.game_over
+        row["ticks"] = state.ticks
+        row["screens"] = state.screens
+
+        if self.surface is not None:
+            self._render(row["frame"])
+
+    def _render(self, frame: Any) -> None:
+        """
+        Draw the game at 1/frame_scale size with the game's own images and copy it into frame.
+        """
+        import pygame
+        from assets import asset_cache
+
+        scale = self.frame_scale
+        state = self.state
+        surface = self.surface
+
+        surface.blit(asset_cache.image("background.png", surface.get_size(), alpha=False), (0, 0))
+
+        for path, blocks in (("platform.png", state.platforms), ("strawberry.png", state.items), ("player.png", [state.player])):
+            for block in blocks:
+                rect = block.rect
+                image = asset_cache.image(path, (max(1, rect.width // scale), max(1, rect.height // scale)))
+                surface.blit(image, (rect.x // scale, rect.y // scale))
+
+        # surfarray is indexed (x, y); the frame is row-major like an image.
+        frame[...] = pygame.surfarray.pixels3d(surface).transpose(1, 0, 2)
+
+
+def _frame_size(frame_scale: int) -> tuple[int, int]:
+    return max(1, Constants._screen_w() // frame_scale), max(1, Constants._screen_h() // frame_scale)
+
+
+def _write_rects(rows: Any, blocks: list) -> None:
+    """
+    Copy block rects into rows and zero the rest; blocks past the end are left out.
+    """
+    count = min(len(blocks), len(rows))
+    if count:
+        rows[:count] = [tuple(block.rect) for block in blocks[:count]]
+    rows[count:] = 0
+
+
+def _worker(first: int, count: int, name: str, shape: tuple, dtype: Any, config: dict, seed: int, frame_scale: int, connection: Any) -> None:
+    """
+    Worker process: run environments first..first+count-1 until told to close.
+    Every command is answered with None, or the error it raised as text.
+    """
+    configure(config)
+    memory = shared_memory.SharedMemory(name=name)
+    ring = None
+    try:
+        ring = np.ndarray(shape, dtype, memory.buf)
+        instances = [_Instance(seed + first + number, frame_scale) for number in range(count)]
+
+        while True:
+            command, slot, indices, actions = connection.recv()
+            if command == "close":
+                break
+
+            try:
+                for number, index in enumerate(indices):
+                    instance = instances[index - first]
+                    if command == "reset":
+                        instance.reset()
+                    else:
+                        instance.step(actions[number])
+                    instance.observe(ring[slot, index])
+            except Exception as error:
+                connection.send(f"{type(error).__name__}: {error}")
+            else:
+                connection.send(None)
+    finally:
+        del ring
+        memory.close()
+        connection.close()
+
+
+class VecEnv(Constants):
+    """
+    num_envs games stepped together. workers is the number of worker
+    processes, one per game by default; with fewer, the games are split
+    between them in contiguous blocks. Game i is seeded with seed + i.
+
+    Each call returns a NumPy record array of num_envs observations (see
+    observation_dtype()) that is a view of the shared ring: it stays valid
+    for the next _ENV_RING - 1 calls, after which its slot is overwritten.
+    """
+
+    def __init__(self, num_envs: int, workers: int = None, seed: int = 0, frame_scale: int = None, ring: int = None):
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+
+        self.num_envs = num_envs
+        self.workers = min(num_envs, workers or num_envs)
+        self.ring_size = ring if ring is not None else self._env_ring()
+        self.frame_scale = frame_scale if frame_scale is not None else self._env_frame_scale()
+        self.slot = -1      # Slot of the latest observations.
+
+        frame_size = _frame_size(self.frame_scale) if self.frame_scale is not None else None
+        self.dtype = observation_dtype(self._num_platforms(), frame_size)
+        shape = (self.ring_size, num_envs)
+        self._memory = shared_memory.SharedMemory(create=True, size=max(1, self.dtype.itemsize * num_envs * self.ring_size))
+        self.ring = np.ndarray(shape, self.dtype, self._memory.buf)
+        self.ring[...] = np.zeros((), self.dtype)
+
+        # Contiguous blocks of games, as even as possible.
+        bounds = [num_envs * worker // self.workers for worker in range(self.workers + 1)]
+        self._blocks = list(zip(bounds[:-1], bounds[1:]))
+        self._owner = np.repeat(np.arange(self.workers), [end - start for start, end in self._blocks])
+
+        config = snapshot()
+        self._connections = []
+        self._processes = []
+        for start, end in self._blocks:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(start, end - start, self._memory.name, shape, self.dtype, config, seed, self.frame_scale, child),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+        self.closed = False
+
+    def reset(self, indices: Any = None) -> Any:
+        """
+        Start new games in the environments at indices (all by default) and
+        return every observation. The others carry over their latest one.
+        """
+        indices = np.arange(self.num_envs) if indices is None else np.asarray(indices, dtype=int).reshape(-1)
+        return self._run("reset", indices, None)
+
+    def step(self, actions: Any) -> tuple:
+        """
+        Make one move in every game. actions is (num_envs, 2): the slingshot
+        drag (dx, dy) in pixels, as a player would pull it, or NaN to make no
+        jump. A game that is over stays over until it is reset.
+        Return (observations, rewards, dones); the last two are views of the first.
+        """
+        actions = np.asarray(actions, dtype=np.float64).reshape(self.num_envs, 2)
+        observations = self._run("step", np.arange(self.num_envs), actions)
+        return observations, observations["reward"], observations["done"]
+
+    def _run(self, command: str, indices: Any, actions: Any) -> Any:
+        """
+        Send command for indices to their workers, then wait for all of them.
+        """
+        if self.closed:
+            raise RuntimeError("the environment is closed")
+
+        previous = self.slot
+        self.slot = (self.slot + 1) % self.ring_size
+        if previous >= 0 and len(indices) < self.num_envs:
+            # Games that are not part of this call keep their latest observation.
+            self.ring[self.slot] = self.ring[previous]
+
+        busy = []
+        for worker, connection in enumerate(self._connections):
+            mine = indices[self._owner[indices] == worker]
+            if len(mine):
+                connection.send((command, self.slot, mine.tolist(), None if actions is None else actions[mine]))
+                busy.append((worker, connection))
+
+        errors = [f"worker {worker}: {reply}" for worker, connection in busy if (reply := connection.recv()) is not None]
+        if errors:
+            raise RuntimeError("\n".join(errors))
+
+        return self.ring[self.slot]
+
+    def close(self) -> None:
+        """
+        Stop the workers and free the shared memory. Observations returned
+        earlier must not be used afterwards.
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        for connection in self._connections:
+            try:
+                connection.send(("close", None, None, None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections:
+            connection.close()
+
+        del self.ring
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self) -> "VecEnv":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
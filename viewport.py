@@ -0,0 +1,279 @@
+from constants import Constants
+from config import settings
+from assets import asset_cache
+from typing import Any
+import math
+import pygame
+import weakref
+
+# Resolution independence. The game logic, layouts and dirty rects all stay in
+# logical coordinates (SCREEN_WIDTH x SCREEN_HEIGHT); the Viewport fits that
+# area into the window at one uniform scale, centered, with black bars on the
+# sides that do not match the aspect ratio. Drawing goes through a Canvas,
+# which blits the scaled copy of each surface. A copy is made the first time
+# the surface is drawn at a new scale and kept until the next resize, so
+# steady-state frames never call pygame.transform; at scale 1 a Canvas hands
+# every call straight to the window surface. Text is the exception: it is
+# rendered with fonts sized for the window and marked native(), so it is
+# blitted as is instead of being scaled as a bitmap.
+
+
+class Viewport(Constants):
+    """
+    Maps logical coordinates onto the window and keeps the scaled surfaces
+    for the current window size. version changes on every resize.
+    """
+
+    def __init__(self):
+        self.scale = 1.0
+        self.offset = (0, 0)    # Window position of the logical origin.
+        self.size = (settings.screen_width, settings.screen_height)    # Window size.
+        self.area = pygame.Rect((0, 0), self.size)  # The part of the window the game is drawn in.
+        self.identity = True    # Logical and window coordinates are the same.
+        self.version = 0
+        self.rescales = 0       # Surfaces scaled since the process started.
+        self._scaled = weakref.WeakKeyDictionary()  # Source surface -> its copy at the current scale.
+        self._native = weakref.WeakKeyDictionary()  # Surface at window resolution -> its logical size.
+
+    def fit(self, size: tuple) -> None:
+        """
+        Fit the logical screen into a window of size and drop the scaled copies.
+        """
+        width, height = size
+        self.scale = min(width / settings.screen_width, height / settings.screen_height)
+        self.offset = (
+            (width - round(settings.screen_width * self.scale)) // 2,
+            (height - round(settings.screen_height * self.scale)) // 2,
+        )
+        self.size = (width, height)
+        self.area = pygame.Rect(self.offset, (round(settings.screen_width * self.scale), round(settings.screen_height * self.scale)))
+        self.identity = self.scale == 1 and self.offset == (0, 0)
+        self._scaled.clear()
+        self._native.clear()
+        self.version += 1
+
+    def position(self, point: tuple) -> tuple[int, int]:
+        """
+        Return the window position of a logical point.
+        """
+        if self.identity:
+            return int(point[0]), int(point[1])
+        return self.offset[0] + math.floor(point[0] * self.scale), self.offset[1] + math.floor(point[1] * self.scale)
+
+    def rect(self, rect: Any) -> Any:
+        """
+        Return the window rect covering a logical rect, including the pixel a
+        scaled surface drawn at its corner can round over by.
+        """
+        rect = pygame.Rect(rect)
+        if self.identity:
+            return rect
+
+        left, top = self.position(rect.topleft)
+        right = self.offset[0] + math.ceil(rect.right * self.scale) + 1
+        bottom = self.offset[1] + math.ceil(rect.bottom * self.scale) + 1
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def logical(self, point: tuple) -> tuple[int, int]:
+        """
+        Return the logical point under a window position (the mouse).
+        """
+        if self.identity:
+            return point
+        return math.floor((point[0] - self.offset[0]) / self.scale), math.floor((point[1] - self.offset[1]) / self.scale)
+
+    def overlaps(self, rect: Any, rects: list) -> bool:
+        """
+        Return True if the window pixels of rect and any of rects overlap.
+        """
+        if self.identity:
+            return rect.collidelist(rects) != -1
+        return self.rect(rect).collidelist([self.rect(other) for other in rects]) != -1
+
+    def logical_rect(self, rect: Any) -> Any:
+        """
+        Return the logical rect covering a window rect.
+        """
+        if self.identity:
+            return pygame.Rect(rect)
+
+        rect = pygame.Rect(rect)
+        left, top = self.logical(rect.topleft)
+        right = math.ceil((rect.right - self.offset[0]) / self.scale)
+        bottom = math.ceil((rect.bottom - self.offset[1]) / self.scale)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def events(self, events: list) -> list:
+        """
+        Return events with mouse positions moved into logical coordinates.
+        """
+        if self.identity:
+            return events
+
+        moved = []
+        for event in events:
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+                attributes = dict(event.dict, pos=self.logical(event.pos))
+                event = pygame.event.Event(event.type, attributes)
+            moved.append(event)
+        return moved
+
+    def native(self, surface: Any) -> Any:
+        """
+        Mark surface as drawn at the current scale already (text rendered with
+        a font sized for the window) and return it. It is blitted unscaled and
+        covers its size divided by the scale in logical coordinates.
+        """
+        if not self.identity:
+            width, height = surface.get_size()
+            self._native[surface] = (math.ceil(width / self.scale), math.ceil(height / self.scale))
+        return surface
+
+    def logical_size(self, surface: Any) -> tuple[int, int]:
+        """
+        Return the logical size of a surface drawn through a Canvas.
+        """
+        size = self._native.get(surface)
+        return size if size is not None else surface.get_size()
+
+    def image(self, surface: Any) -> Any:
+        """
+        Return surface at the current scale, scaling it only the first time.
+        """
+        if self.identity or surface in self._native:
+            return surface
+
+        scaled = self._scaled.get(surface)
+        if scaled is None:
+            width, height = surface.get_size()
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            scaled = asset_cache.rescale(surface, size)
+            self._scaled[surface] = scaled
+            self.rescales += 1
+        return scaled
+
+
+class Canvas(Constants):
+    """
+    A drawing target in logical coordinates over a window-sized surface (the
+    display, or an off-screen layer). It has the parts of the Surface API the
+    game uses, so sprite groups draw onto it, and every rect it returns is
+    logical.
+    """
+
+    def __init__(self, surface: Any, viewport: Viewport):
+        self.viewport = viewport
+        self.attach(surface)
+
+    def attach(self, surface: Any) -> None:
+        """
+        Draw on surface from now on, clipped to the game area so nothing
+        (a taller background, a player half off the side) spills into the bars.
+        """
+        self.surface = surface
+        self.clip()
+
+    def clip(self, rect: Any = None) -> None:
+        """
+        Limit drawing to the pixels under a logical rect, or lift the limit.
+        """
+        self.surface.set_clip(self.viewport.area if rect is None else self.viewport.rect(rect).clip(self.viewport.area))
+
+    def layer(self) -> "Canvas":
+        """
+        Return a new off-screen canvas the size of this one.
+        """
+        return Canvas(pygame.Surface(self.surface.get_size()).convert(), self.viewport)
+
+    def get_size(self) -> tuple[int, int]:
+        return settings.screen_width, settings.screen_height
+
+    def get_width(self) -> int:
+        return settings.screen_width
+
+    def get_height(self) -> int:
+        return settings.screen_height
+
+    def get_rect(self) -> Any:
+        return pygame.Rect((0, 0), self.get_size())
+
+    def blit(self, source: Any, dest: Any, area: Any = None, special_flags: int = 0) -> Any:
+        """
+        Draw a surface (or another canvas) with its top left at the logical dest.
+        """
+        viewport = self.viewport
+        layer = isinstance(source, Canvas)
+        if viewport.identity:
+            return self.surface.blit(source.surface if layer else source, dest, area, special_flags)
+
+        x, y = dest[0], dest[1]
+        if area is None:
+            position = viewport.position((x, y))
+            if layer:
+                # A layer is already at window resolution, bars included.
+                self.surface.blit(source.surface, (position[0] - viewport.offset[0], position[1] - viewport.offset[1]), None, special_flags)
+            else:
+                self.surface.blit(viewport.image(source), position, None, special_flags)
+            width, height = source.get_size() if layer else viewport.logical_size(source)
+            return pygame.Rect(x, y, width, height)
+
+        # Copying part of a surface: the same covering rect on both sides.
+        area = pygame.Rect(area)
+        target = viewport.rect((x, y, area.width, area.height))
+        window_area = viewport.rect(area)
+        if not layer:
+            window_area.move_ip(-viewport.offset[0], -viewport.offset[1])
+        self.surface.blit(source.surface if layer else viewport.image(source), target, window_area, special_flags)
+        return pygame.Rect(x, y, area.width, area.height)
+
+    def blits(self, blit_sequence: Any, doreturn: bool = True) -> Any:
+        if self.viewport.identity:
+            return self.surface.blits(blit_sequence, doreturn)
+
+        rects = [self.blit(*entry) for entry in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color: tuple, rect: Any = None) -> Any:
+        if rect is None:
+            self.surface.fill(color)
+            return self.get_rect()
+        self.surface.fill(color, self.viewport.rect(rect))
+        return pygame.Rect(rect)
+
+    def draw_rect(self, color: tuple, rect: Any, width: int = 0) -> Any:
+        """
+        pygame.draw.rect() in logical coordinates; the border width scales too.
+        """
+        viewport = self.viewport
+        if viewport.identity:
+            return pygame.draw.rect(self.surface, color, rect, width)
+
+        rect = pygame.Rect(rect)
+        left, top = viewport.position(rect.topleft)
+        right, bottom = viewport.position(rect.bottomright)
+        border = max(1, round(width * viewport.scale)) if width else 0
+        return viewport.logical_rect(pygame.draw.rect(self.surface, color, (left, top, right - left, bottom - top), border))
+
+    def draw_circle(self, color: tuple, center: tuple, radius: int) -> Any:
+        """
+        A filled pygame.draw.circle() in logical coordinates.
+        """
+        viewport = self.viewport
+        if viewport.identity:
+            return pygame.draw.circle(self.surface, color, center, radius)
+
+        drawn = pygame.draw.circle(self.surface, color, viewport.position(center), max(1, round(radius * viewport.scale)))
+        return viewport.logical_rect(drawn)
+
+    def update(self, rects: list) -> None:
+        """
+        Push logical rects of the display to the window.
+        """
+        if self.viewport.identity:
+            pygame.display.update(rects)
+            return
+        pygame.display.update([self.viewport.rect(rect) for rect in rects])
+
+
+# Shared by every canvas in the process.
+viewport = Viewport()
@@ -0,0 +1,110 @@
+from constants import Constants
+from config import settings
+from helper_functions import generate_platforms
+from spatial_index import SpatialGroup
+from sprites import platform_pool, item_pool
+from typing import Any
+
+
+class ChunkedWorld(Constants):
+    """
+    Endless tower for the infinite-scroll mode. The world is split into
+    screen-high chunks stacked upwards in world coordinates (chunk k sits k
+    screens above the start). Chunks are generated lazily with
+    generate_platforms() while they are within _STREAM_AHEAD pixels above the
+    player, and evicted once they fall completely below the camera, so the
+    number of live sprites stays constant however high the player climbs.
+    """
+
+    def __init__(self, rng: Any = None):
+        self.rng = rng              # Layout generator shared by every chunk.
+        self.platforms = SpatialGroup()
+        self.items = SpatialGroup()
+        self.chunks = {}            # Chunk number -> list of its sprites.
+        self.chunk_of = {}          # Sprite -> the number of the chunk holding it.
+        self.camera_y = 0           # World y of the top of the screen.
+        self.generated = 0          # Chunks generated so far.
+        self.evicted = 0
+        self.top_platform = None    # World (x, y) of the highest platform generated so far.
+        self.start_platform = self._generate_chunk(0)
+
+    def floor(self) -> int:
+        """
+        World y of the bottom of the screen. Falling past it is Game Over.
+        """
+        return self.camera_y + settings.screen_height
+
+    def scroll(self, player: Any, touched_platforms: set) -> None:
+        """
+        Move the camera up with the player, then stream chunks in above and out below.
+        """
+        # The camera only ever moves up, keeping the player in the upper part of the screen.
+        target = player.rect.top - int(settings.screen_height * settings.camera_follow)
+        self.camera_y = min(self.camera_y, target)
+
+        # Generate until the top of the tower is far enough ahead of the player.
+        ahead = player.rect.top - settings.stream_ahead
+        while self._chunk_top(self.generated - 1) > ahead:
+            self._generate_chunk(self.generated)
+
+        # Evict chunks that are entirely below the screen.
+        for number in [number for number in self.chunks if self._chunk_top(number) >= self.floor()]:
+            for sprite in self.chunks.pop(number):
+                del self.chunk_of[sprite]
+                touched_platforms.discard(sprite)
+                (item_pool if isinstance(sprite, item_pool.sprite_class) else platform_pool).release(sprite)
+            self.evicted += 1
+
+    def collect(self, item: Any) -> None:
+        """
+        Forget a picked-up item. It goes back to the pool, and a newer chunk
+        may reuse it, so evicting its old chunk must not release it again.
+        """
+        number = self.chunk_of.pop(item, None)
+        if number is not None:
+            self.chunks[number].remove(item)
+
+    def draw(self, surface: Any, player: Any, player_rect: Any) -> None:
+        """
+        Draw the platforms, items and player shifted by the camera.
+        """
+        offset = -self.camera_y
+        for sprite in self.platforms:
+            surface.blit(sprite.image, sprite.rect.move(0, offset))
+
+        for sprite in self.items:
+            surface.blit(sprite.image, sprite.rect.move(0, offset))
+
+        surface.blit(player.image, player_rect.move(0, offset))
+
+    def _chunk_top(self, number: int) -> int:
+        return -number * settings.screen_height
+
+    def _generate_chunk(self, number: int) -> Any:
+        """
+        Generate one screen of platforms with generate_platforms(), move it into
+        place and add it to the world. Return the chunk's lowest platform.
+        Each chunk is climbable from the top platform of the chunk below it.
+        """
+        start = None
+        if self.top_platform is not None:
+            x, y = self.top_platform
+            start = (x, y - self._chunk_top(number))    # In this chunk's screen coordinates.
+
+        platforms, items, lowest_platform, highest_platform = generate_platforms(self._num_platforms(), self.rng, start)
+        new_platforms = platforms.sprites()
+        new_items = items.sprites()
+
+        # Leave the temporary groups before moving, so their indexes stay consistent.
+        platforms.empty()
+        items.empty()
+        for sprite in new_platforms + new_items:
+            sprite.rect.y += self._chunk_top(number)
+
+        self.top_platform = highest_platform.rect.topleft
+        self.platforms.add(new_platforms)
+        self.items.add(new_items)
+        self.chunks[number] = new_platforms + new_items
+        self.chunk_of.update(dict.fromkeys(self.chunks[number], number))
+        self.generated += 1
+        return lowest_platform